@@ -1,16 +1,11 @@
-from flask import Flask, render_template, request, redirect
-import subprocess
-import threading
+from flask import Flask, render_template, request, redirect, make_response, Response
 import os
 import sys
-from datetime import datetime
-import requests
-from dns_checker import check_dns_spoofing
+from datetime import datetime, timezone
 import logging
-import ssl
-import socket
-from urllib.parse import urlparse
 import hashlib
+import json
+import time
 
 # Import the Waitress server
 from waitress import serve
@@ -21,48 +16,240 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+# The collectors live in scripts/; make their shared modules importable here
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+from dashboard_store import store
+from history_store import attack_history
+from news import FEEDS, ALL_SOURCES
+from collector_supervisor import CollectorSupervisor, build_jobs
+from integrity_checks import IntegrityMonitor
+from http_client import client as http_client
+
 app = Flask(__name__)
 
-# Define the URL for Tailwind CSS
-TAILWIND_URL = "https://cdn.tailwindcss.com?version=3.4.3"
+# Page templates are compiled once per process, at import, and never
+# re-checked on disk; every render reuses the compiled template
+app.config["TEMPLATES_AUTO_RELOAD"] = False
+PAGE_TEMPLATES = ['dashboard.html', 'view.html', 'FortinetScraper/Attempt3/Scraper.html', 'History/History.html']
+for template_name in PAGE_TEMPLATES:
+    app.jinja_env.get_template(template_name)
+
+# News pages are served by filename, e.g. /NewNews/BbcTech.html
+NEWS_PAGES = {feed["filename"]: feed["title"] for feed in FEEDS + [ALL_SOURCES]}
+
+# Chart images behind the views that are not backed by the dashboard store
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "Images")
+VIEW_IMAGES = {
+    "scraper_charts": ['Attack_Severity.png', 'Attack_Types.png', 'Most_Attacks_Incoming.png', 'Most_Attacks_Outgoing.png'],
+    "history": ['attack_trends.png'],
+}
 
-# This function adds headers to all responses to prevent caching
+# Displays poll /api/versions; its answer is recomputed at most this often,
+# in seconds, however many displays are attached
+VERSIONS_CACHE_SECONDS = 2
+
+# Rendered bodies per page, keyed by the data version they were rendered from
+_page_cache = {}
+
+# Clients may keep responses but must revalidate them on every use. Pages and
+# API responses carry content-hash ETags and static files carry Flask's own
+# ETag/Last-Modified, so an unchanged resource costs a 304 and no body.
 @app.after_request
-def add_no_cache_headers(response):
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+def add_revalidation_headers(response):
+    response.headers.setdefault("Cache-Control", "no-cache")
     return response
 
+def conditional_response(body, etag, updated_at=None, mimetype="text/html"):
+    """
+    Returns body with its ETag and, if updated_at (epoch seconds) is given,
+    Last-Modified. Matching If-None-Match / If-Modified-Since requests get a 304.
+    """
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.set_etag(etag)
+    if updated_at is not None:
+        response.last_modified = datetime.fromtimestamp(updated_at, tz=timezone.utc)
+    return response.make_conditional(request)
+
+def content_etag(body):
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def conditional_page(key, view, render, mimetype="text/html"):
+    """
+    Returns a conditional response for a page built from a store view.
+
+    The body is rendered once per view version and its SHA-256 becomes the
+    ETag. Last-Modified is the time the collector last published the view.
+    """
+    snapshot = store.get(view) if view else {"version": 0, "updated_at": None}
+    cached = _page_cache.get(key)
+    if cached is None or cached[0] != snapshot["version"]:
+        body = render(snapshot)
+        cached = (snapshot["version"], body, content_etag(body))
+        _page_cache[key] = cached
+    return conditional_response(cached[1], cached[2], snapshot["updated_at"], mimetype)
+
 # Route for the main dashboard
 @app.route('/')
 def dashboard():
-    return render_template('dashboard.html')
+    return conditional_page('dashboard', None, lambda snapshot: render_template('dashboard.html'))
 
-# Routes for the files in the "sites" array
+# Routes for the pages in the "sites" array
 @app.route('/DownDetector/Down_Detector_Test.html')
 def down_detector_test():
-    return render_template('DownDetector/Down_Detector_Test.html')
+    def render(snapshot):
+        report = snapshot["data"].get("report", {"generated_at": "Pending", "results": {}})
+        return render_template('view.html', view="down_detector", report=report)
+    return conditional_page('down_detector', "down_detector", render)
 
 @app.route('/FortinetScraper/Attempt3/Scraper.html')
 def fortinet_scraper():
-    return render_template('FortinetScraper/Attempt3/Scraper.html')
+    return conditional_page('fortinet_scraper', None,
+                            lambda snapshot: render_template('FortinetScraper/Attempt3/Scraper.html'))
 
 @app.route('/History/History.html')
 def history():
-    return render_template('History/History.html')
+    return conditional_page('history', None, lambda snapshot: render_template('History/History.html'))
+
+def render_news_page(filename):
+    title = NEWS_PAGES[filename]
+    def render(snapshot):
+        feed = snapshot["data"].get(title, {"title": title, "articles": []})
+        return render_template('view.html', view="news", feed=feed)
+    return conditional_page(f'news:{filename}', "news", render)
 
 @app.route('/NewNews/BbcTech.html')
 def bbc_tech():
-    return render_template('NewNews/BbcTech.html')
+    return render_news_page('BbcTech.html')
 
 @app.route('/NewNews/BleepingComputer.html')
 def bleeping_computer():
-    return render_template('NewNews/BleepingComputer.html')
+    return render_news_page('BleepingComputer.html')
 
 @app.route('/NewNews/WiredNews.html')
 def wired_news():
-    return render_template('NewNews/WiredNews.html')
+    return render_news_page('WiredNews.html')
+
+@app.route('/NewNews/AllSources.html')
+def all_sources_news():
+    return render_news_page('AllSources.html')
+
+# JSON data API backed by the dashboard store
+def conditional_json(view):
+    return conditional_page(f'api:{view}', view, app.json.dumps, mimetype="application/json")
+
+@app.route('/api/news')
+def api_news():
+    return conditional_json("news")
+
+@app.route('/api/status')
+def api_status():
+    return conditional_json("down_detector")
+
+@app.route('/api/attacks')
+def api_attacks():
+    return conditional_json("fortinet")
+
+# Attack buckets and their 1h rolling average, e.g. /api/history?hours=168.
+# The resolution (minute, hour or day) follows the range unless ?resolution= is given;
+# either way the range is capped at that tier's retention and MAX_QUERY_POINTS buckets.
+@app.route('/api/history')
+def api_history():
+    hours = request.args.get('hours', default=None, type=float)
+    try:
+        body, etag = history_body(hours, request.args.get('resolution'))
+    except ValueError as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype="application/json")
+    return conditional_response(body, etag, mimetype="application/json")
+
+# Serialized /api/history bodies per (hours, resolution), as (state, body, etag).
+# The state is the history store's version and the current minute, since the
+# bucket grid moves with the clock even when no rows arrive.
+_history_cache = {}
+HISTORY_CACHE_ENTRIES = 32
+
+def history_body(hours, resolution):
+    """
+    Returns the /api/history JSON body and its ETag, rebuilt only when the
+    history store or the bucket grid has moved on.
+
+    Returns:
+        tuple: (body, etag).
+
+    Raises:
+        ValueError: If hours or resolution is not a valid range or tier.
+    """
+    key = (hours, resolution)
+    state = (attack_history.version, time.time() // 60)
+    cached = _history_cache.get(key)
+    if cached is None or cached[0] != state:
+        buckets = attack_history.buckets(hours, resolution=resolution)
+        payload = {"resolution": buckets.pop("resolution")}
+        for name, values in buckets.items():
+            payload[name] = [None if value != value else value for value in values.tolist()]  # NaN -> null
+        body = json.dumps(payload)
+        cached = (state, body, content_etag(body))
+        if len(_history_cache) >= HISTORY_CACHE_ENTRIES:
+            _history_cache.clear()  # arbitrary ?hours= values must not grow the cache without bound
+        _history_cache[key] = cached
+    return cached[1], cached[2]
+
+def view_versions():
+    """Returns the current data version of every dashboard view."""
+    versions = {view: store.get(view)["version"] for view in ("news", "down_detector")}
+    for view, filenames in VIEW_IMAGES.items():
+        mtimes = [0]
+        for filename in filenames:
+            try:
+                mtimes.append(os.stat(os.path.join(IMAGES_DIR, filename)).st_mtime_ns)
+            except OSError:
+                pass
+        versions[view] = max(mtimes)
+    return versions
+
+# The last view_versions() result as (computed_at, body, etag)
+_versions_cache = None
+
+def current_versions():
+    """Returns view_versions() as a JSON body and its ETag, cached for VERSIONS_CACHE_SECONDS."""
+    global _versions_cache
+    cached = _versions_cache
+    if cached is None or time.monotonic() - cached[0] >= VERSIONS_CACHE_SECONDS:
+        body = json.dumps(view_versions(), sort_keys=True)
+        cached = (time.monotonic(), body, content_etag(body))
+        _versions_cache = cached
+    return cached[1], cached[2]
+
+# Set by start_collectors() when the server starts
+collector_supervisor = None
+
+# Latest integrity check results, re-run as they expire
+integrity_monitor = IntegrityMonitor()
+
+@app.route('/api/integrity')
+def api_integrity():
+    snapshot = integrity_monitor.snapshot()
+    body = json.dumps(snapshot)
+    return conditional_response(body, content_etag(body), snapshot["updated_at"], mimetype="application/json")
+
+# Run-time metrics for each collector job
+@app.route('/api/collectors')
+def api_collectors():
+    metrics = collector_supervisor.metrics() if collector_supervisor else []
+    return Response(json.dumps(metrics), mimetype="application/json")
+
+# Per-host connection reuse, retry and latency metrics of the shared HTTP client
+@app.route('/api/http')
+def api_http():
+    return Response(json.dumps(http_client.metrics()), mimetype="application/json")
+
+# The version of every view. Displays poll this with If-None-Match, so an
+# unchanged set of versions costs a 304 and no body.
+@app.route('/api/versions')
+def api_versions():
+    body, etag = current_versions()
+    return conditional_response(body, etag, mimetype="application/json")
 
 # A new route for the hidden redirect tool
 @app.route('/redirect-tool', methods=['GET', 'POST'])
@@ -79,169 +266,19 @@ def redirect_tool():
             return "Please enter a URL.", 400
     return render_template('tools/redirect_tool.html')
 
-# Function to run all the data collection scripts
-def run_scripts_in_separate_processes():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    scripts_dir = os.path.join(base_dir, "scripts")
-
-    scripts_to_run = [
-        "Fortinet_Attack_History.py",
-        "Fortiscraper3.py",
-        "down_detector.py",
-        "news.py"
-    ]
-
-    for script_name in scripts_to_run:
-        script_path = os.path.join(scripts_dir, script_name)
-        logging.info(f"Starting script: {script_name}...")
-        try:
-            # Use Popen to run the script non-blocking
-            # We explicitly redirect stderr to a pipe so we can read it if it fails
-            # This makes the error output more controlled
-            process = subprocess.Popen([sys.executable, script_path], stderr=subprocess.PIPE, text=True)
-            # You can optionally read the stderr here if you need to
-            # err_output = process.communicate()[1]
-            # if err_output:
-            #     logging.error(f"Error from {script_name}:\n{err_output}")
-            logging.info(f"Successfully started {script_name}.")
-        except FileNotFoundError:
-            logging.error(f"Error: The script {script_name} was not found at {script_path}")
-        except Exception as e:
-            logging.error(f"An unexpected error occurred while trying to run {script_name}: {e}")
-
-# A new function to check the status of an external URL
-def check_url_status(url):
-    try:
-        # We perform a GET request with a short timeout to check if the URL is reachable
-        response = requests.get(url, timeout=5)
-        # A status code of 200 means the request was successful
-        if response.status_code == 200:
-            return "OK", "Successfully connected to the URL."
-        else:
-            return "FAIL", f"Received status code {response.status_code}."
-    except requests.exceptions.RequestException as e:
-        # Any exception (e.g., DNS error, timeout, connection refused) means a failure
-        return "FAIL", f"Request failed: {e}"
-
-# This new function performs all the integrity checks and prints the results
-def perform_integrity_checks():
-    logging.info("\n--- Running Integrity Checks ---")
-    
-    # Check local files
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, "data")
-    test_files = {
-        "Fortinet Attack History": os.path.join(data_dir, "fortinet_attack_history.txt"),
-        "FortiScraper Data": os.path.join(data_dir, "fortinet_data.json"),
-        "Down Detector Data": os.path.join(data_dir, "down_detector_data.json"),
-        "News Feed Data": os.path.join(data_dir, "news_data.json")
-    }
-    
-    for test_name, file_path in test_files.items():
-        if os.path.exists(file_path):
-            last_modified_timestamp = os.path.getmtime(file_path)
-            last_modified = datetime.fromtimestamp(last_modified_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-            logging.info(f"[{test_name}] OK - Last modified: {last_modified}")
-        else:
-            logging.warning(f"[{test_name}] FAIL - File not found.")
-
-    # Check external URL
-    tailwind_status, tailwind_message = check_url_status(TAILWIND_URL)
-    logging.info(f"[External URL: {TAILWIND_URL}] {tailwind_status} - {tailwind_message}")
-
-    # New integrity check for Tailwind CSS hash
-    check_tailwind_integrity()
+# Function to run all the data collection jobs in this process
+def start_collectors():
+    global collector_supervisor
+    collector_supervisor = CollectorSupervisor(build_jobs())
+    logging.info(f"Starting collectors: {', '.join(job.name for job in collector_supervisor.jobs)}")
+    collector_supervisor.start()
 
-    # Check for DNS spoofing
-    dns_status, dns_message = check_dns_spoofing(TAILWIND_URL.replace('https://', ''))
-    logging.info(f"[DNS Consistency Check] {dns_status} - {dns_message}")
-    
-    # New function to get SSL certificate details
-    def get_ssl_certificate(hostname, port=443):
-        try:
-            context = ssl.create_default_context()
-            with socket.create_connection((hostname, port)) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cert = ssock.getpeercert()
-                    return {
-                        'subject': cert['subject'],
-                        'issuer': cert['issuer'],
-                        'notAfter': cert['notAfter']
-                    }
-        except Exception as e:
-            return {'error': str(e)}
-
-    # List of scraping sites to check
-    scraped_sites = [
-        "https://www.fortinet.com",
-        "https://www.downdetector.com",
-        "https://www.bbc.co.uk",
-        "https://www.bleepingcomputer.com",
-        "https://www.wired.com"
-    ]
-
-    logging.info("\n--- SSL Certificate Checks ---")
-    for site_url in scraped_sites:
-        try:
-            hostname = urlparse(site_url).hostname
-            cert_info = get_ssl_certificate(hostname)
-            if 'error' in cert_info:
-                logging.warning(f"[{hostname}] SSL Check FAILED - {cert_info['error']}")
-            else:
-                subject_cn = next((item[1] for item in cert_info['subject'][0] if item[0] == 'commonName'), 'N/A')
-                issuer_cn = next((item[1] for item in cert_info['issuer'][0] if item[0] == 'commonName'), 'N/A')
-                not_after = datetime.strptime(cert_info['notAfter'], '%b %d %H:%M:%S %Y %Z').strftime('%Y-%m-%d %H:%M:%S')
-                logging.info(f"[{hostname}] SSL Check OK - Subject: {subject_cn}, Issuer: {issuer_cn}, Valid until: {not_after}")
-        except Exception as e:
-            logging.error(f"An error occurred while checking {site_url}: {e}")
-
-    logging.info("--- All Checks Complete ---\n")
-
-def check_tailwind_integrity():
-    logging.info(f"Checking integrity of {TAILWIND_URL}...")
-    
-    # File path for the local hash file
-    HASH_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tailwind_hash.txt')
-    
-    # 1. Read the known-good hash from the file
-    known_good_hash = ""
+    # The history collector's "run now" hotkey (ctrl+shift+s+k) queues the job on the supervisor
     try:
-        with open(HASH_FILE_PATH, 'r') as f:
-            known_good_hash = f.read().strip()
-            if not known_good_hash:
-                logging.error(f"[Tailwind CSS Hash Check] FAIL - The hash file is empty: {HASH_FILE_PATH}")
-                return False
-    except FileNotFoundError:
-        logging.error(f"[Tailwind CSS Hash Check] FAIL - Hash file not found: {HASH_FILE_PATH}")
-        return False
+        from Fortinet_Attack_History import hotkey_listener
+        hotkey_listener(lambda: collector_supervisor.run_now("history"))
     except Exception as e:
-        logging.error(f"[Tailwind CSS Hash Check] FAIL - Could not read the hash file: {e}")
-        return False
-    
-    # 2. Download the external file and compute its hash
-    try:
-        # Use verify=False to bypass SSL check if needed.
-        # This is a temporary solution for testing; remove for production.
-        response = requests.get(TAILWIND_URL, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        tailwind_content = response.content
-        current_hash = hashlib.sha256(tailwind_content).hexdigest()
-        
-        # 3. Compare the hashes
-        if current_hash == known_good_hash:
-            logging.info("[Tailwind CSS Hash Check] OK - Hash matches the stored value.")
-            return True
-        else:
-            logging.warning(f"[Tailwind CSS Hash Check] FAIL - Hash mismatch! The file may be compromised. Expected: {known_good_hash}, Got: {current_hash}")
-            return False
-            
-    except requests.exceptions.RequestException as e:
-        logging.error(f"[Tailwind CSS Hash Check] FAIL - Could not download the file: {e}")
-        return False
-    except Exception as e:
-        logging.error(f"[Tailwind CSS Hash Check] FAIL - An unexpected error occurred: {e}")
-        return False
+        logging.warning(f"Run-now hotkey unavailable: {e}")
 
 if __name__ == '__main__':
     # Configure logging to output to a file
@@ -251,14 +288,11 @@ if __name__ == '__main__':
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
-    # Start a new thread to run the integrity checks at startup
-    check_thread = threading.Thread(target=perform_integrity_checks)
-    check_thread.start()
-
-    # Start a new thread to run the scripts concurrently
-    script_thread = threading.Thread(target=run_scripts_in_separate_processes)
-    script_thread.daemon = True
-    script_thread.start()
+    # Run the integrity checks in the background, each as often as its TTL allows
+    integrity_monitor.start()
+
+    # Run every collector on a supervised worker thread in this process
+    start_collectors()
 
     # The Flask development server is not for production use.
     # We will now use Waitress, a production-grade WSGI server, to handle requests.
@@ -0,0 +1,135 @@
+"""
+Per-chart timing of the Fortinet charts: the old pyplot + seaborn path,
+which builds a new figure per chart per cycle, against chart_renderer's
+persistent Agg figures. Each renderer runs in its own process so the peak
+RSS of each can be compared.
+
+    python DashboardServer/bench/bench_charts.py [--cycles 5] [--records 500]
+
+Images are written to a temporary directory.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts"))
+
+CHARTS = ['Attack_Severity.png', 'Attack_Types.png', 'Most_Attacks_Incoming.png', 'Most_Attacks_Outgoing.png']
+LABELS = ['severity', 'types', 'incoming', 'outgoing']
+
+
+def cycle_counts(cycles, records):
+    """Chart inputs for each cycle, from a different synthetic payload every time."""
+    from Fortiscraper3 import aggregate_attacks, weighted_counts
+    from synthetic import threat_items
+
+    inputs = []
+    for cycle in range(cycles):
+        df_attacks = aggregate_attacks(threat_items(records, seed=cycle))
+        inputs.append({
+            'Attack_Severity.png': weighted_counts(df_attacks, 'severity'),
+            'Attack_Types.png': weighted_counts(df_attacks, 'profile_type'),
+            'Most_Attacks_Incoming.png': weighted_counts(df_attacks, 'dest_country').head(10),
+            'Most_Attacks_Outgoing.png': weighted_counts(df_attacks, 'src_country').head(10),
+        })
+    return inputs
+
+
+def pyplot_renderers():
+    """The charts as Fortiscraper3 drew them before chart_renderer: a fresh pyplot figure each time."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    def pie(title):
+        def render(path, counts):
+            plt.figure(figsize=(6, 6))
+            counts.plot.pie(autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
+            plt.title(title)
+            plt.ylabel('')
+            plt.tight_layout()
+            plt.savefig(path)
+            plt.close()
+        return render
+
+    def bar(title, xlabel, ylabel):
+        def render(path, counts):
+            plt.figure(figsize=(10, 6))
+            sns.barplot(x=counts.values, y=counts.index, palette="viridis")
+            plt.title(title)
+            plt.xlabel(xlabel)
+            plt.ylabel(ylabel)
+            plt.tight_layout()
+            plt.savefig(path)
+            plt.close()
+        return render
+
+    return {
+        'Attack_Severity.png': pie('Attack Severity Distribution'),
+        'Attack_Types.png': pie('Attack Types Distribution'),
+        'Most_Attacks_Incoming.png': bar('Most Attacks Incoming by Country (Top 10)',
+                                         'Number of Attacks', 'Destination Country'),
+        'Most_Attacks_Outgoing.png': bar('Most Attacks Outgoing by Country (Top 10)',
+                                         'Number of Attacks', 'Source Country'),
+    }
+
+
+def agg_renderers():
+    """Fortiscraper3's persistent charts; update() and save() bypass render()'s unchanged-data skip."""
+    from Fortiscraper3 import charts
+
+    def renderer(chart):
+        def render(path, counts):
+            chart.update(counts)
+            chart.save(path)
+        return render
+
+    return {name: renderer(chart) for name, chart in charts.items()}
+
+
+def run(renderer_name, cycles, records):
+    """Renders every chart for each cycle and prints the mean time per chart and the peak RSS."""
+    warnings.filterwarnings("ignore")  # seaborn's palette-without-hue notice
+    inputs = cycle_counts(cycles + 1, records)
+    renderers = pyplot_renderers() if renderer_name == "pyplot" else agg_renderers()
+    times = {name: [] for name in CHARTS}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for cycle, counts in enumerate(inputs):
+            for name in CHARTS:
+                start = time.perf_counter()
+                renderers[name](os.path.join(output_dir, name), counts[name])
+                if cycle:  # the first cycle only warms up imports, fonts and caches
+                    times[name].append(time.perf_counter() - start)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    means = "  ".join(f"{sum(times[name]) / len(times[name]) * 1000:8.1f}" for name in CHARTS)
+    print(f"  {renderer_name:7} {means}   peak RSS {peak_mb:6.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--renderer", choices=["pyplot", "agg"], help="run one renderer in this process")
+    args = parser.parse_args()
+
+    if args.renderer:
+        run(args.renderer, args.cycles, args.records)
+        return
+
+    print(f"Mean ms per chart over {args.cycles} warm cycles ({args.records} records):")
+    print("          " + "  ".join(f"{label:>8}" for label in LABELS))
+    for renderer_name in ("pyplot", "agg"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--renderer", renderer_name,
+                        "--cycles", str(args.cycles), "--records", str(args.records)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmarks the generated pages: view.html rendered through the app's
+precompiled template with N news items and with N status cards, plus the
+one-off cost of turning N feed entries into stored news items. Time and
+peak allocation should both grow linearly with N.
+
+    python DashboardServer/bench/bench_render.py [--sizes 1000 2000 4000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flask import render_template
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts"))
+import app as dashboard_app
+from news_store import NewsItemStore
+
+SECTIONS = ["websites", "microsoft", "fortinet", "snowflake"]
+STATUSES = ["Running", "Service Restored", "Not Running"]
+
+
+def feed_entries(count):
+    """Feed entries as feedparser returns them, with HTML summaries and titles that need escaping."""
+    return [{
+        "id": f"urn:story:{i}",
+        "link": f"https://example.com/story/{i}",
+        "title": f"Story {i}: attackers abuse <iframe> srcdoc & more",
+        "summary": f"<p>Summary of story {i} with <b>markup</b>, <a href='#'>a link</a> &amp; entities.</p>" * 3,
+        "published": "Thu, 01 Jan 2026 00:00:00 +0000",
+        "published_parsed": time.gmtime(1767225600 - i * 60),
+    } for i in range(count)]
+
+
+def status_report(count):
+    results = {section: [] for section in SECTIONS}
+    for i in range(count):
+        results[SECTIONS[i % len(SECTIONS)]].append({
+            "service": f"https://service{i}.example.com",
+            "status": STATUSES[i % len(STATUSES)],
+            "message": "Status Code: 503\nRetrying <soon>",
+            "category": SECTIONS[i % len(SECTIONS)],
+        })
+    return {"generated_at": "2026-01-01 00:00:00", "results": results}
+
+
+def measure(func, repeat):
+    """Returns (best seconds over repeat runs, peak traced MB of one run)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>6}  {'ingest':>16}  {'news render':>16}  {'cards render':>16}")
+    with dashboard_app.app.test_request_context(), tempfile.TemporaryDirectory() as data_dir:
+        for size in args.sizes:
+            entries = feed_entries(size)
+
+            def ingest():
+                store = NewsItemStore(os.path.join(data_dir, "news_items.json"), max_items_per_feed=size)
+                store.merge("Bench", entries)
+                return store
+
+            feed = {"title": "Bench", "articles": ingest().items("Bench")}
+            report = status_report(size)
+            ingest_time, ingest_peak = measure(ingest, 1)
+            news_time, news_peak = measure(lambda: render_template('view.html', view="news", feed=feed),
+                                           args.repeat)
+            cards_time, cards_peak = measure(
+                lambda: render_template('view.html', view="down_detector", report=report), args.repeat)
+            print(f"{size:6}  {ingest_time * 1000:6.1f} ms {ingest_peak:4.1f} MB  "
+                  f"{news_time * 1000:6.1f} ms {news_peak:4.1f} MB  {cards_time * 1000:6.1f} ms {cards_peak:4.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmarks the Fortinet threat distributions on a synthetic outbreak payload:
+the old one-row-per-attack expansion against Fortiscraper3's per-record
+aggregation. Both must produce the same four distributions.
+
+    python DashboardServer/bench/bench_threat_aggregation.py [--records 500] [--max-count 2000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts"))
+from Fortiscraper3 import aggregate_attacks, weighted_counts
+from synthetic import threat_payload
+
+COLUMNS = ['severity', 'profile_type', 'dest_country', 'src_country']
+
+
+def expanded_distributions(payload):
+    """The pre-aggregation path: one dict per hit, then value_counts()."""
+    all_attacks = []
+    for attacks in payload['ips'].values():
+        for attack in attacks:
+            count = attack.get('count', 0)
+            for _ in range(count):
+                all_attacks.append({column: attack.get(column, 'Unknown') for column in COLUMNS})
+    df_attacks = pd.DataFrame(all_attacks)
+    return {column: df_attacks[column].value_counts().to_dict() for column in COLUMNS}
+
+
+def aggregated_distributions(payload):
+    items = (attack for attacks in payload['ips'].values() for attack in attacks)
+    df_attacks = aggregate_attacks(items)
+    return {column: weighted_counts(df_attacks, column).to_dict() for column in COLUMNS}
+
+
+def measure(func, payload, repeat):
+    """Returns (result, best seconds over repeat runs, peak traced MB of one run)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(payload)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(payload)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--max-count", type=int, default=2000, help="largest hit count of one record")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = threat_payload(args.records, args.max_count)
+    hits = sum(attack['count'] for attacks in payload['ips'].values() for attack in attacks)
+    print(f"{args.records} records, {hits} hits")
+
+    old, old_time, old_peak = measure(expanded_distributions, payload, args.repeat)
+    new, new_time, new_peak = measure(aggregated_distributions, payload, args.repeat)
+    if {c: {str(k): int(v) for k, v in old[c].items()} for c in COLUMNS} != \
+            {c: {str(k): int(v) for k, v in new[c].items()} for c in COLUMNS}:
+        sys.exit("Distributions differ between the two paths")
+
+    print(f"  expanded rows: {old_time * 1000:9.1f} ms  peak {old_peak:7.1f} MB")
+    print(f"  aggregated:    {new_time * 1000:9.1f} ms  peak {new_peak:7.1f} MB")
+    print("  distributions identical")
+
+
+if __name__ == "__main__":
+    main()
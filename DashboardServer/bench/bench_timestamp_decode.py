@@ -0,0 +1,76 @@
+"""
+Micro-benchmark of threat-map timestamp decoding at several payload sizes:
+the old per-item datetime/pytz path against Fortinet_Attack_History's
+column-array decode plus one vectorized conversion to the display zone.
+
+    python DashboardServer/bench/bench_timestamp_decode.py [--sizes 500 5000 50000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts"))
+from Fortinet_Attack_History import decode_threat_items
+from history_store import DISPLAY_TZ
+from synthetic import threat_payload
+
+
+def per_item_decode(payload):
+    """The old manage_data loop: one datetime and one dict per record, then a DataFrame."""
+    jersey_tz = pytz.timezone(DISPLAY_TZ)
+    new_data = []
+    for attacks_list in payload['ips'].values():
+        for item in attacks_list:
+            timestamp_ms = int(item.get('redis_ms', '0-0').split('-')[0])
+            utc_time = datetime.utcfromtimestamp(timestamp_ms / 1000).replace(tzinfo=pytz.UTC)
+            new_data.append({'timestamp': utc_time.astimezone(jersey_tz), 'attacks': item.get('count', 0)})
+    new_df = pd.DataFrame(new_data)
+    new_df['timestamp'] = pd.to_datetime(new_df['timestamp']).dt.tz_convert(DISPLAY_TZ)
+    return new_df
+
+
+def column_decode(payload):
+    """int64 column arrays, converted to display-zone timestamps in one call."""
+    items = (item for attacks in payload['ips'].values() for item in attacks)
+    timestamps_ms, counts = decode_threat_items(items)
+    return pd.to_datetime(timestamps_ms, unit='ms', utc=True).tz_convert(DISPLAY_TZ), counts
+
+
+def best_time(func, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'records':>8}  {'per item':>10}  {'columns':>10}  speedup")
+    for size in args.sizes:
+        payload = threat_payload(size)
+        old = per_item_decode(payload)
+        timestamps, counts = column_decode(payload)
+        if not (np.array_equal(old['timestamp'].to_numpy(), timestamps.to_numpy())
+                and np.array_equal(old['attacks'].to_numpy(), counts)):
+            sys.exit(f"Decoded values differ at {size} records")
+
+        old_time = best_time(per_item_decode, payload, args.repeat)
+        new_time = best_time(column_decode, payload, args.repeat)
+        print(f"{size:8}  {old_time * 1000:8.1f}ms  {new_time * 1000:8.1f}ms  {old_time / new_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test: simulated dashboard displays polling pages, the JSON API and a
+chart image from the app under Waitress, first with plain GETs and then
+revalidating with If-None-Match / If-Modified-Since as browsers do.
+
+    python DashboardServer/bench/load_test_displays.py [--displays 50] [--seconds 5]
+
+The app is served from a temporary dashboard store filled with synthetic
+news and status data, so nothing under DashboardServer/data is touched.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from waitress.server import create_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts"))
+import app as dashboard_app
+from dashboard_store import DashboardStore
+from news import FEEDS
+
+# What one display fetches on each pass, as the rotating iframes do
+RESOURCES = [
+    "/NewNews/BbcTech.html",
+    "/api/news",
+    "/static/Images/Attack_Severity.png",
+    "/History/History.html",
+]
+SERVER_THREADS = 8  # as app.py serves
+
+
+def fill_store(store, articles=50):
+    # Published under the real feed titles, so every news page has content
+    for title in (feed["title"] for feed in FEEDS):
+        store.update("news", title, {"title": title, "url": None, "articles": [
+            {"title": f"{title} story {i}", "link": f"https://example.com/{i}", "published": "January 01, 2026",
+             "summary": "Synthetic summary text. " * 10, "source": title} for i in range(articles)]})
+    store.update("down_detector", "report", {"generated_at": "2026-01-01 00:00:00", "results": {
+        "websites": [{"service": f"https://site{i}.example", "status": "Running", "message": "Status Code: 200",
+                      "category": "websites"} for i in range(20)]}})
+
+
+def run_display(base_url, revalidate, stop, totals, lock):
+    session = requests.Session()
+    validators = {}
+    requests_made = statuses_304 = body_bytes = 0
+    while not stop.is_set():
+        for path in RESOURCES:
+            headers = {}
+            if revalidate and path in validators:
+                etag, last_modified = validators[path]
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+            response = session.get(base_url + path, headers=headers)
+            requests_made += 1
+            body_bytes += len(response.content)
+            if response.status_code == 304:
+                statuses_304 += 1
+            else:
+                validators[path] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    with lock:
+        totals["requests"] += requests_made
+        totals["304"] += statuses_304
+        totals["bytes"] += body_bytes
+
+
+def load_test(base_url, displays, seconds, revalidate):
+    stop = threading.Event()
+    lock = threading.Lock()
+    totals = {"requests": 0, "304": 0, "bytes": 0}
+    threads = [threading.Thread(target=run_display, args=(base_url, revalidate, stop, totals, lock))
+               for _ in range(displays)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return totals, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--displays", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("waitress").setLevel(logging.ERROR)  # queue depth warnings are expected here
+    dashboard_app.store = DashboardStore(tempfile.mkdtemp())
+    fill_store(dashboard_app.store)
+
+    server = create_server(dashboard_app.app, host="127.0.0.1", port=0, threads=SERVER_THREADS)
+    threading.Thread(target=server.run, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.effective_port}"
+
+    print(f"{args.displays} displays, {len(RESOURCES)} resources each, {args.seconds:g}s per run, "
+          f"Waitress with {SERVER_THREADS} threads")
+    for label, revalidate in (("unconditional", False), ("revalidating", True)):
+        totals, elapsed = load_test(base_url, args.displays, args.seconds, revalidate)
+        count = totals["requests"] or 1
+        print(f"  {label:13}: {totals['requests'] / elapsed:7.0f} req/s, "
+              f"{totals['bytes'] / count / 1024:6.1f} KB per request, "
+              f"{100 * totals['304'] / count:3.0f}% 304s")
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
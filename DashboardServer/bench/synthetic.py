@@ -0,0 +1,35 @@
+import random
+import time
+
+# Value pools shaped like the Fortinet outbreak API
+SEVERITIES = ["critical", "high", "medium", "low", "info"]
+PROFILE_TYPES = ["ips", "botnet", "malware", "webfilter", "application", "dns", "anomaly", "ssl"]
+COUNTRIES = ["United States", "China", "Russia", "Germany", "Brazil", "India", "United Kingdom", "France",
+             "Netherlands", "Japan", "South Korea", "Vietnam", "Iran", "Canada", "Singapore", "Turkey",
+             "Ukraine", "Australia", "Italy", "Spain"]
+
+
+def threat_items(records=500, max_count=2000, seed=1, window_ms=60 * 60 * 1000):
+    """
+    Returns `records` synthetic threat-map records, as the outbreak API's
+    'ips' segments hold them, with hit counts of up to max_count each (an
+    outbreak burst). redis_ms timestamps fall within the last window_ms.
+    """
+    rng = random.Random(seed)
+    now_ms = int(time.time() * 1000)
+    return [{
+        "severity": rng.choice(SEVERITIES),
+        "profile_type": rng.choice(PROFILE_TYPES),
+        "dest_country": rng.choice(COUNTRIES),
+        "src_country": rng.choice(COUNTRIES),
+        "count": rng.randint(1, max_count),
+        "redis_ms": f"{now_ms - rng.randrange(window_ms)}-{i}",
+    } for i in range(records)]
+
+
+def threat_payload(records=500, max_count=2000, seed=1, segments=12):
+    """The same records wrapped in the API's {"ips": {segment: [record, ...]}} body."""
+    payload = {"ips": {}}
+    for i, item in enumerate(threat_items(records, max_count, seed)):
+        payload["ips"].setdefault(str(i % segments), []).append(item)
+    return payload
@@ -1,10 +1,132 @@
-import dns.resolver
+import asyncio
 import socket
+import time
+
+import dns.asyncresolver
+
+# --- Configuration ---
+# Public resolvers the local answers are compared against, as "ip" or "ip:port"
+TRUSTED_RESOLVERS = ["8.8.8.8", "1.1.1.1"]
+SYSTEM_CACHE_TTL = 60  # seconds; the system resolver does not report record TTLs
+MAX_CACHE_TTL = 60 * 60
+LOOKUP_TIMEOUT = 5  # seconds per lookup
+MAX_CONCURRENT_LOOKUPS = 50
+
+
+def _parse_resolver(address):
+    host, sep, port = address.rpartition(":")
+    if sep and host.count(":") == 0 and port.isdigit():
+        return host, int(port)
+    return address, 53
+
+
+class DnsConsistencyChecker:
+    """
+    Compares what the local system resolves each hostname to with what a set
+    of trusted resolvers return.
+
+    Lookups for many hostnames run concurrently. Answers are cached for
+    their record TTL (SYSTEM_CACHE_TTL for the system resolver, which does
+    not report one), so repeated checks only hit the network as records
+    expire. Pass system_nameservers to query specific servers instead of
+    the operating system's resolver, e.g. a local stub in tests.
+    """
+
+    def __init__(self, trusted_resolvers=TRUSTED_RESOLVERS, system_nameservers=None,
+                 timeout=LOOKUP_TIMEOUT, max_concurrency=MAX_CONCURRENT_LOOKUPS):
+        self.trusted = {address: self._make_resolver([address], timeout) for address in trusted_resolvers}
+        self.system = self._make_resolver(system_nameservers, timeout) if system_nameservers else None
+        self.max_concurrency = max_concurrency
+        self._cache = {}
+
+    @staticmethod
+    def _make_resolver(addresses, timeout):
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        servers = [_parse_resolver(address) for address in addresses]
+        resolver.nameservers = [host for host, _ in servers]
+        resolver.port = servers[0][1]
+        resolver.lifetime = timeout
+        return resolver
+
+    async def _resolve_with(self, resolver, hostname):
+        answer = await resolver.resolve(hostname, 'A')
+        return sorted(rdata.address for rdata in answer), min(answer.rrset.ttl, MAX_CACHE_TTL)
+
+    async def _resolve_system(self, hostname):
+        if self.system is not None:
+            return await self._resolve_with(self.system, hostname)
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            hostname, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        return sorted({info[4][0] for info in infos}), SYSTEM_CACHE_TTL
+
+    async def _lookup(self, source, hostname, resolve):
+        """Returns the cached or freshly resolved IPs of hostname from source."""
+        key = (source, hostname)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        ips, ttl = await resolve()
+        self._cache[key] = (time.monotonic() + ttl, ips)
+        return ips
+
+    async def check(self, hostname):
+        """
+        Checks one hostname.
+
+        Returns:
+            tuple: (status, message, details). 'OK' when every locally
+                   resolved IP is among the trusted answers, 'WARNING' when
+                   some are not, 'FAIL' when the local lookup or all trusted
+                   lookups fail. details maps "system" and each trusted
+                   resolver to its IPs or error.
+        """
+        lookups = {"system": self._lookup("system", hostname, lambda: self._resolve_system(hostname))}
+        for address, resolver in self.trusted.items():
+            lookups[address] = self._lookup(address, hostname,
+                                            lambda resolver=resolver: self._resolve_with(resolver, hostname))
+        answers = await asyncio.gather(*lookups.values(), return_exceptions=True)
+
+        details = {}
+        for source, answer in zip(lookups, answers):
+            details[source] = {"error": str(answer) or type(answer).__name__} \
+                if isinstance(answer, Exception) else {"ips": answer}
+
+        local = details["system"]
+        if "error" in local:
+            return "FAIL", f"Could not resolve '{hostname}' locally. Error: {local['error']}", details
+        trusted_ips = set()
+        for address in self.trusted:
+            trusted_ips.update(details[address].get("ips", []))
+        if not trusted_ips:
+            return "FAIL", f"Could not resolve '{hostname}' via any trusted resolver.", details
+
+        local_ips = local["ips"]
+        if set(local_ips) <= trusted_ips:
+            return "OK", f"DNS resolution is consistent. IP(s): {', '.join(local_ips)}", details
+        return "WARNING", (f"DNS mismatch detected! Local IPs: {', '.join(local_ips)}. "
+                           f"Trusted IPs: {', '.join(sorted(trusted_ips))}"), details
+
+    async def check_many(self, hostnames):
+        """Checks every hostname concurrently. Returns {hostname: (status, message, details)}."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(hostname):
+            async with semaphore:
+                return await self.check(hostname)
+
+        unique = list(dict.fromkeys(hostnames))
+        return dict(zip(unique, await asyncio.gather(*(bounded(hostname) for hostname in unique))))
+
+
+def check_dns_consistency(hostnames, trusted_resolvers=TRUSTED_RESOLVERS):
+    """Blocking batch check with a one-off checker. Returns {hostname: (status, message, details)}."""
+    return asyncio.run(DnsConsistencyChecker(trusted_resolvers).check_many(hostnames))
+
 
 def check_dns_spoofing(domain):
     """
     Checks for potential DNS spoofing by comparing the IP address
-    resolved by the local system against a trusted public DNS server.
+    resolved by the local system against the trusted public DNS servers.
 
     Args:
         domain (str): The domain name to check.
@@ -13,39 +135,5 @@ def check_dns_spoofing(domain):
         tuple: A tuple containing a status string ('OK', 'WARNING', or 'FAIL')
                and a descriptive message.
     """
-    try:
-        # --- Local DNS Resolution ---
-        # Get the IP address that the local system resolves to.
-        # This uses the DNS server configured on the machine.
-        local_ips = socket.gethostbyname_ex(domain)[2]
-        local_ips_set = set(local_ips)
-
-        # --- Trusted DNS Resolution ---
-        # Perform a DNS lookup using a trusted, public DNS server (Google's DNS)
-        # This bypasses the local system's DNS configuration.
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = ['8.8.8.8']  # Use Google's Public DNS
-
-        trusted_ips = []
-        answers = resolver.resolve(domain, 'A')
-        for rdata in answers:
-            trusted_ips.append(rdata.address)
-        trusted_ips_set = set(trusted_ips)
-
-        # --- Comparison ---
-        if local_ips_set == trusted_ips_set:
-            # All local IPs match the trusted IPs.
-            return "OK", f"DNS resolution is consistent. IP(s): {', '.join(local_ips)}"
-        elif local_ips_set.issubset(trusted_ips_set):
-            # Local IPs are a subset of trusted IPs (e.g., local DNS returned one IP, trusted returned multiple).
-            return "OK", f"DNS resolution is consistent. IP(s): {', '.join(local_ips)}"
-        else:
-            # The sets of IP addresses do not match, indicating a potential issue.
-            return "WARNING", f"DNS mismatch detected! Local IPs: {', '.join(local_ips)}. Trusted IPs: {', '.join(trusted_ips)}"
-
-    except socket.gaierror as e:
-        return "FAIL", f"Could not resolve '{domain}' locally. Error: {e}"
-    except dns.exception.DNSException as e:
-        return "FAIL", f"Could not resolve '{domain}' via trusted DNS. Error: {e}"
-    except Exception as e:
-        return "FAIL", f"An unexpected error occurred during DNS check: {e}"
+    status, message, _ = check_dns_consistency([domain])[domain]
+    return status, message
@@ -0,0 +1,394 @@
+import asyncio
+import json
+import logging
+import os
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+from artifact_writer import write_json
+from asset_hashes import AssetVerifier, load_manifest, MANIFEST_PATH
+from dns_checker import DnsConsistencyChecker
+from http_client import client
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+TAILWIND_URL = "https://cdn.tailwindcss.com?version=3.4.3"
+LOCAL_FILES = {
+    # Rewritten by the history store on every append
+    "Fortinet Attack History": os.path.join(DATA_DIR, "attack_history", "rollup_minute.bin"),
+    "FortiScraper Data": os.path.join(DATA_DIR, "fortinet_data.json"),
+    "Down Detector Data": os.path.join(DATA_DIR, "down_detector_data.json"),
+    "News Feed Data": os.path.join(DATA_DIR, "news_data.json")
+}
+# Sites whose TLS certificates are checked
+SCRAPED_SITES = [
+    "https://www.fortinet.com",
+    "https://www.downdetector.com",
+    "https://www.bbc.co.uk",
+    "https://www.bleepingcomputer.com",
+    "https://www.wired.com"
+]
+PROBE_TIMEOUT = 10  # seconds allowed for any single probe
+GLOBAL_TIMEOUT = 30  # seconds allowed for the whole run
+MAX_CONCURRENT_PROBES = 100
+PROBE_THREADS = 16  # workers for the probes that block (HTTP via the shared client)
+CERT_WARNING_DAYS = 14  # certificates closer than this to expiry are a WARNING
+
+# How long a result stays fresh, in seconds, per check
+CHECK_TTLS = {
+    "Local File": 5 * 60,
+    "External URL": 5 * 60,
+    "Asset Hash": 60 * 60,
+    "DNS Consistency": 5 * 60,
+    "SSL Certificate": 24 * 60 * 60,
+}
+DEFAULT_TTL = 5 * 60
+RETRY_TTL = 5 * 60  # a check that did not pass is retried at least this often
+CHECK_INTERVAL = 60  # seconds between looks for expired checks
+RESULTS_PATH = os.path.join(DATA_DIR, "integrity_status.json")
+
+# Worst first, so a run's overall status is the lowest index among its results
+STATUS_ORDER = ["FAIL", "WARNING", "OK"]
+
+
+class CheckResult:
+    """The outcome of one probe: which check, against what, and how it went."""
+
+    def __init__(self, check, target, status, message, duration, details=None):
+        self.check = check
+        self.target = target
+        self.status = status
+        self.message = message
+        self.duration = duration
+        self.details = details or {}
+
+    def to_dict(self):
+        return {
+            "check": self.check,
+            "target": self.target,
+            "status": self.status,
+            "message": self.message,
+            "duration": self.duration,
+            "details": self.details,
+        }
+
+
+class Probe:
+    """
+    A named check. `run` is a coroutine function taking no arguments and
+    returning a (status, message, details) tuple.
+    """
+
+    def __init__(self, check, target, run, timeout=PROBE_TIMEOUT):
+        self.check = check
+        self.target = target
+        self.run = run
+        self.timeout = timeout
+
+
+# --- Probes ---
+
+async def probe_local_file(path):
+    if not os.path.exists(path):
+        return "FAIL", "File not found.", {}
+    last_modified = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+    return "OK", f"Last modified: {last_modified}", {"last_modified": last_modified}
+
+
+def check_url_status(url, timeout=5):
+    """Returns ("OK", message) if a GET of url answers 200, else ("FAIL", message)."""
+    try:
+        response = client.get(url, timeout=timeout)
+        if response.status_code == 200:
+            return "OK", "Successfully connected to the URL."
+        return "FAIL", f"Received status code {response.status_code}."
+    except requests.exceptions.RequestException as e:
+        return "FAIL", f"Request failed: {e}"
+
+
+async def probe_url(url, timeout=5):
+    status, message = await asyncio.to_thread(check_url_status, url, timeout)
+    return status, message, {}
+
+
+asset_verifier = AssetVerifier()
+
+
+async def probe_asset(url, expected):
+    return await asyncio.to_thread(asset_verifier.verify, url, expected)
+
+
+async def probe_missing_manifest(path):
+    return "FAIL", f"No asset manifest found: {path}", {}
+
+
+dns_checker = DnsConsistencyChecker()
+
+
+async def probe_dns(hostname, checker=None):
+    return await (checker or dns_checker).check(hostname)
+
+
+def _common_name(name):
+    return next((value for rdn in name for key, value in rdn if key == 'commonName'), 'N/A')
+
+
+async def probe_certificate(hostname, port=443, ssl_context=None, warning_days=CERT_WARNING_DAYS):
+    """
+    Opens a TLS connection to hostname:port and reports the certificate's
+    subject, issuer and expiry. Verification failures are a FAIL; a
+    certificate expiring within warning_days is a WARNING.
+    """
+    context = ssl_context or ssl.create_default_context()
+    _, writer = await asyncio.open_connection(hostname, port, ssl=context, server_hostname=hostname)
+    try:
+        cert = writer.get_extra_info('peercert')
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    expires = ssl.cert_time_to_seconds(cert['notAfter'])
+    days_left = (expires - time.time()) / 86400
+    details = {
+        "subject": _common_name(cert['subject']),
+        "issuer": _common_name(cert['issuer']),
+        "not_after": datetime.fromtimestamp(expires, timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        "days_left": round(days_left, 1),
+    }
+    message = f"Subject: {details['subject']}, Issuer: {details['issuer']}, Valid until: {details['not_after']}"
+    if days_left < warning_days:
+        return "WARNING", f"Certificate expires in {days_left:.0f} days. {message}", details
+    return "OK", message, details
+
+
+def build_probes(tailwind_url=TAILWIND_URL, manifest=None, local_files=LOCAL_FILES,
+                 sites=SCRAPED_SITES, ssl_context=None, dns=None):
+    """
+    Returns the standard set of probes: local files, Tailwind reachability,
+    one hash check per asset in the manifest (default: load_manifest()),
+    and a DNS consistency and a certificate check per host. dns overrides
+    the shared DnsConsistencyChecker.
+    """
+    probes = [
+        Probe("Local File", name, lambda path=path: probe_local_file(path))
+        for name, path in local_files.items()
+    ]
+    tailwind_host = urlparse(tailwind_url).hostname
+    probes += [
+        Probe("External URL", tailwind_url, lambda: probe_url(tailwind_url)),
+    ]
+    if manifest is None:
+        manifest = load_manifest()
+    if not manifest:
+        probes.append(Probe("Asset Hash", MANIFEST_PATH, lambda: probe_missing_manifest(MANIFEST_PATH)))
+    for url, expected in manifest.items():
+        probes.append(Probe("Asset Hash", url, lambda url=url, expected=expected: probe_asset(url, expected)))
+    # Hostnames only: urls carry schemes, ports and query strings
+    hosts = dict.fromkeys([tailwind_host] + [urlparse(site_url).hostname for site_url in sites])
+    for host in hosts:
+        probes.append(Probe("DNS Consistency", host, lambda host=host: probe_dns(host, dns)))
+    for site_url in sites:
+        parsed = urlparse(site_url)
+        probes.append(Probe("SSL Certificate", parsed.hostname,
+                            lambda host=parsed.hostname, port=parsed.port or 443:
+                            probe_certificate(host, port, ssl_context)))
+    return probes
+
+
+# --- Runner ---
+
+async def _run_probe(probe, semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            status, message, details = await asyncio.wait_for(probe.run(), probe.timeout)
+        except asyncio.TimeoutError:
+            status, message, details = "FAIL", f"Timed out after {probe.timeout}s.", {}
+        except Exception as e:
+            status, message, details = "FAIL", f"{type(e).__name__}: {e}", {}
+        return CheckResult(probe.check, probe.target, status, message, time.perf_counter() - start, details)
+
+
+async def run_checks(probes, global_timeout=GLOBAL_TIMEOUT, max_concurrency=MAX_CONCURRENT_PROBES):
+    """
+    Runs every probe concurrently, at most max_concurrency at a time. Each
+    probe is bounded by its own timeout and the whole run by global_timeout;
+    probes still unfinished then are cancelled and reported as FAIL.
+
+    Returns:
+        dict: 'started_at' (ISO 8601 UTC), 'duration' (seconds), 'status'
+              (the worst result) and 'results' (CheckResult dicts, in probe
+              order).
+    """
+    started_at = datetime.now(timezone.utc).isoformat()
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [asyncio.create_task(_run_probe(probe, semaphore)) for probe in probes]
+    if tasks:
+        await asyncio.wait(tasks, timeout=global_timeout)
+
+    results = []
+    for probe, task in zip(probes, tasks):
+        if task.done():
+            results.append(task.result())
+        else:
+            task.cancel()
+            results.append(CheckResult(probe.check, probe.target, "FAIL",
+                                       f"Not finished within the {global_timeout}s run timeout.",
+                                       time.perf_counter() - start))
+
+    statuses = [result.status for result in results] or ["OK"]
+    return {
+        "started_at": started_at,
+        "duration": time.perf_counter() - start,
+        "status": min(statuses, key=STATUS_ORDER.index),
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def run_integrity_checks(probes=None, global_timeout=GLOBAL_TIMEOUT, max_concurrency=MAX_CONCURRENT_PROBES):
+    """
+    Runs the probes (default: build_probes()) on a fresh event loop and
+    returns the report.
+
+    Blocking probes run on a pool owned by this run (asyncio.to_thread uses
+    the loop's default executor). The pool is shut down without waiting, so
+    a thread stuck past its timeout is left to finish in the background
+    instead of holding the run open the way asyncio.run() would.
+    """
+    if probes is None:
+        probes = build_probes()
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=PROBE_THREADS, thread_name_prefix="integrity-probe")
+    loop.set_default_executor(executor)
+    try:
+        return loop.run_until_complete(run_checks(probes, global_timeout, max_concurrency))
+    finally:
+        try:
+            # Let the probes cancelled at the deadline unwind; abandoned threads are not awaited
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.close()
+
+
+def log_report(report):
+    """Writes a report to the log, one line per result."""
+    for result in report["results"]:
+        level = logging.INFO if result["status"] == "OK" else logging.WARNING
+        logging.log(level, f"[{result['check']}: {result['target']}] {result['status']} - {result['message']}")
+    logging.info(f"--- All Checks Complete ({report['status']}, {report['duration']:.1f}s) ---")
+
+
+class IntegrityMonitor:
+    """
+    Keeps the latest result of every probe and re-runs a probe only once its
+    check's TTL (CHECK_TTLS) has expired, so certificates are checked daily
+    while DNS and reachability stay a few minutes fresh.
+
+    Results are held in memory for the status endpoint and persisted to
+    path, so a restart picks up where the last run left off instead of
+    repeating every check.
+    """
+
+    def __init__(self, probes=None, path=RESULTS_PATH, interval=CHECK_INTERVAL, ttls=CHECK_TTLS):
+        self.probes = build_probes() if probes is None else probes
+        self.path = path
+        self.interval = interval
+        self.ttls = ttls
+        self._results = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._load()
+
+    @staticmethod
+    def _key(check, target):
+        return f"{check}|{target}"
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for result in saved.get("results", []):
+            self._results[self._key(result["check"], result["target"])] = result
+
+    def _ttl(self, probe, result):
+        ttl = self.ttls.get(probe.check, DEFAULT_TTL)
+        if result["status"] != "OK":
+            ttl = min(ttl, RETRY_TTL)
+        return ttl
+
+    def due(self):
+        """Returns the probes with no result yet or whose result has expired."""
+        now = time.time()
+        due = []
+        with self._lock:
+            for probe in self.probes:
+                result = self._results.get(self._key(probe.check, probe.target))
+                if result is None or now - result["checked_at"] >= self._ttl(probe, result):
+                    due.append(probe)
+        return due
+
+    def run_due(self):
+        """
+        Runs the expired probes, records and persists their results.
+
+        Returns:
+            dict: The run's report (see run_checks), or None if nothing was due.
+        """
+        probes = self.due()
+        if not probes:
+            return None
+        report = run_integrity_checks(probes)
+        checked_at = time.time()
+        with self._lock:
+            for result in report["results"]:
+                result["checked_at"] = checked_at
+                self._results[self._key(result["check"], result["target"])] = result
+        write_json(self.path, self.snapshot())
+        log_report(report)
+        return report
+
+    def snapshot(self):
+        """
+        Returns the latest known state: 'status' (worst result), 'updated_at'
+        (epoch seconds of the newest result, or None) and 'results'.
+        """
+        with self._lock:
+            results = [self._results[key] for key in (self._key(p.check, p.target) for p in self.probes)
+                       if key in self._results]
+        statuses = [result["status"] for result in results]
+        return {
+            "status": min(statuses, key=STATUS_ORDER.index) if statuses else None,
+            "updated_at": max((result["checked_at"] for result in results), default=None),
+            "results": results,
+        }
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="integrity-monitor", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logging.error(f"Integrity checks failed to run: {e}")
+            time.sleep(self.interval)
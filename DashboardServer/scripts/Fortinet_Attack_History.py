@@ -1,169 +1,95 @@
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-import pandas as pd
-import requests
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
+from array import array
+import numpy as np
 import os
 import schedule
 import time
 import threading
 import keyboard  # pip install keyboard
-import pytz  # pip install pytz
+from threatmap_cache import fetch_threat_items
+from history_store import attack_history, now_ms
+from chart_renderer import TrendChart
 
-output_dir = "DashboardServer/static/Images"
+# app.py serves the trend chart from here
+output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "Images")
 run_job_now = False  # Flag for immediate job trigger
+RUN_NOW_HOTKEY = 'ctrl+shift+s+k'
+history_store = attack_history
+trend_chart = TrendChart()  # reused across cycles
+
+def decode_threat_items(items):
+    """
+    Collects threat-map records into column arrays: int64 epoch
+    milliseconds (from each item's redis_ms) and int64 attack counts.
+    Records are consumed one at a time into compact typed buffers, so the
+    payload never has to be materialized. Timestamps stay integers;
+    conversion to datetimes happens once, in bulk, only where a consumer
+    needs it.
+    """
+    timestamps_ms = array('q')
+    counts = array('q')
+    for item in items:
+        timestamps_ms.append(int(item.get('redis_ms', '0-0').partition('-')[0]))
+        counts.append(int(item.get('count', 0)))
+    return np.frombuffer(timestamps_ms, dtype=np.int64), np.frombuffer(counts, dtype=np.int64)
 
 def manage_data():
-    data_file_path = os.path.join(output_dir, 'cyberattack_data.csv')
-
-    if os.path.exists(data_file_path) and os.path.getsize(data_file_path) == 0:
-        pd.DataFrame(columns=['timestamp', 'attacks']).to_csv(data_file_path, index=False)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-    existing_df = pd.DataFrame(columns=['timestamp', 'attacks'])
-    if os.path.exists(data_file_path):
+    # One-off migration of the legacy CSV into the incremental store
+    legacy_csv_path = os.path.join(output_dir, 'cyberattack_data.csv')
+    if history_store.is_empty() and os.path.exists(legacy_csv_path) and os.path.getsize(legacy_csv_path) > 0:
         try:
-            existing_df = pd.read_csv(data_file_path)
-            existing_df['timestamp'] = pd.to_datetime(existing_df['timestamp'], errors='coerce')
-            existing_df = existing_df.dropna(subset=['timestamp'])
-            if existing_df['timestamp'].dt.tz is None:
-                existing_df['timestamp'] = existing_df['timestamp'].dt.tz_localize('Europe/Jersey')
-            else:
-                existing_df['timestamp'] = existing_df['timestamp'].dt.tz_convert('Europe/Jersey')
-        except pd.errors.EmptyDataError:
-            pass
+            history_store.import_csv(legacy_csv_path)
         except Exception as e:
-            print(f"[ERROR] Exception reading CSV: {e}")
+            print(f"[ERROR] Exception importing CSV: {e}")
 
-    url = "https://fortiguard.fortinet.com/api/threatmap/live/outbreak?outbreak_id=0&segment_sec=300&last_sec=3600&replay=true&limit=500"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    # Fetch and data format errors propagate, so the caller sees the cycle fail
+    timestamps_ms, counts = decode_threat_items(fetch_threat_items())
 
-    try:
-        response = requests.get(url, timeout=30, verify=False)
-        response.raise_for_status()
-
-        data = response.json()
-        threat_data = data.get('ips', {})
-        new_data = []
-        jersey_tz = pytz.timezone('Europe/Jersey')
-
-        for timestamp, attacks_list in threat_data.items():
-            for item in attacks_list:
-                timestamp_ms = int(item.get('redis_ms', '0-0').split('-')[0])
-                utc_time = datetime.utcfromtimestamp(timestamp_ms / 1000).replace(tzinfo=pytz.UTC)
-                jersey_time = utc_time.astimezone(jersey_tz)
-                count = item.get('count', 0)
-                new_data.append({'timestamp': jersey_time, 'attacks': count})
-
-        new_df = pd.DataFrame(new_data)
-
-        if not new_df.empty:
-            new_df['timestamp'] = pd.to_datetime(new_df['timestamp']).dt.tz_convert('Europe/Jersey')
-
-        existing_df_clean = existing_df.dropna(axis=1, how='all') if not existing_df.empty else existing_df
-        new_df_clean = new_df.dropna(axis=1, how='all') if not new_df.empty else new_df
-
-        if not existing_df_clean.empty and not new_df_clean.empty:
-            combined_df = pd.concat([existing_df_clean, new_df_clean]).drop_duplicates(subset=['timestamp']).sort_values(by='timestamp')
-        elif not existing_df_clean.empty:
-            combined_df = existing_df_clean.copy()
-        elif not new_df_clean.empty:
-            combined_df = new_df_clean.copy()
-        else:
-            combined_df = pd.DataFrame(columns=['timestamp', 'attacks'])
-
-        combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp'], errors='coerce')
-        combined_df = combined_df.dropna(subset=['timestamp'])
-        if combined_df['timestamp'].dt.tz is None:
-            combined_df['timestamp'] = combined_df['timestamp'].dt.tz_localize('Europe/Jersey')
-        else:
-            combined_df['timestamp'] = combined_df['timestamp'].dt.tz_convert('Europe/Jersey')
-
-        twelve_hours_ago = datetime.now(jersey_tz) - timedelta(hours=12)
-        filtered_df = combined_df[combined_df['timestamp'] > twelve_hours_ago]
-
-        if not filtered_df.empty:
-            filtered_df.to_csv(data_file_path, index=False)
-
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Request error: {e}")
-    except (KeyError, ValueError) as e:
-        print(f"[ERROR] Data format issue: {e}")
-    except Exception as e:
-        print(f"[ERROR] Unexpected error: {e}")
+    # Only rows not already stored are written; expired segments are dropped whole
+    history_store.append(timestamps_ms, counts)
+    history_store.trim()
 
 def create_and_save_plot():
-    data_file_path = os.path.join(output_dir, 'cyberattack_data.csv')
-
-    if not os.path.exists(data_file_path):
+    # One point per minute bucket (720 over 12 hours), however many events arrived
+    buckets = history_store.buckets(resolution="minute")
+    if not buckets['count'].any():
         return
 
-    df = pd.read_csv(data_file_path, parse_dates=['timestamp'])
-    jersey_tz = pytz.timezone('Europe/Jersey')
-    if df.empty:
-        return
+    relative_hour = (buckets['start_ms'] - now_ms()) / 3_600_000
+    trend_chart.update(relative_hour, buckets['mean'], buckets['rolling_average'])
 
-    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-    df = df.dropna(subset=['timestamp'])
-
-    if df['timestamp'].dt.tz is None:
-        df['timestamp'] = df['timestamp'].dt.tz_localize('Europe/Jersey')
-    else:
-        df['timestamp'] = df['timestamp'].dt.tz_convert('Europe/Jersey')
-
-    now = datetime.now(jersey_tz)
-    df['relative_hour'] = (df['timestamp'] - now).dt.total_seconds() / 3600
-    df = df.sort_values('timestamp')
-
-    df['attacks_rolling_avg'] = (
-        df.set_index('timestamp')['attacks']
-        .rolling('1h', closed='right')
-        .mean()
-        .reset_index(drop=True)
-    )
-
-    plt.clf()
-    fig, ax = plt.subplots(figsize=(12, 7))
-    sns.set_style("darkgrid")
-    sns.lineplot(data=df, x='relative_hour', y='attacks', ax=ax, label='Attacks')
-    sns.lineplot(data=df, x='relative_hour', y='attacks_rolling_avg', ax=ax, label='Rolling Average (1h)', color='orange')
-
-    ax.grid(True, which='both', axis='both', linestyle='--', linewidth=0.7, alpha=0.7)
-    ax.set_xlim(-12, 0)
-    ax.set_xticks([-12, -9, -6, -3, 0])
-    ax.set_xticklabels(['-12 Hours', '-9', '-6', '-3', '0 Hours'])
-    ax.set_title('Real-time Cyberattack Trends')
-    ax.set_xlabel('Hours Ago')
-    ax.set_ylabel('Number of Attacks')
-    ax.legend(title='Legend', loc='upper left', fontsize='medium')
-
-    plt.tight_layout()
     filename = "attack_trends.png"
     file_path = os.path.join(output_dir, filename)
 
-    if os.path.exists(file_path):
-        os.remove(file_path)
-
-    plt.savefig(file_path)
+    # Saved atomically, so the web server never serves a missing or partial image
+    trend_chart.save(file_path)
 
 def job():
     manage_data()
     create_and_save_plot()
 
-def hotkey_listener():
-    global run_job_now
-    keyboard.add_hotkey('ctrl+shift+s+k', lambda: trigger_job())
+def run_job():
+    try:
+        job()
+    except Exception as e:
+        print(f"[ERROR] History job failed: {e}")
+
+def hotkey_listener(callback=None):
+    """Calls callback (default: trigger_job) whenever RUN_NOW_HOTKEY is pressed."""
+    keyboard.add_hotkey(RUN_NOW_HOTKEY, callback or trigger_job)
 
 def trigger_job():
     global run_job_now
     run_job_now = True
 
 if __name__ == "__main__":
-    schedule.every(30).minutes.do(job)
-    job()
+    schedule.every(30).minutes.do(run_job)
+    run_job()
     print("History next 30 Mins")
 
     listener_thread = threading.Thread(target=hotkey_listener, daemon=True)
@@ -172,7 +98,7 @@ if __name__ == "__main__":
     while True:
         schedule.run_pending()
         if run_job_now:
-            job()
+            run_job()
             run_job_now = False
         time.sleep(1)
 
@@ -1,129 +1,112 @@
 import pandas as pd
-import requests
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import time
+from threatmap_cache import fetch_threat_items
+from dashboard_store import store
+from chart_renderer import PieChart, TopBarChart
+
+
+# Where app.py serves the charts from
+output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "Images")
+# Figures are created once and only their data is updated each cycle
+charts = {
+    'Attack_Severity.png': PieChart('Attack Severity Distribution'),
+    'Attack_Types.png': PieChart('Attack Types Distribution'),
+    'Most_Attacks_Incoming.png': TopBarChart('Most Attacks Incoming by Country (Top 10)',
+                                             'Number of Attacks', 'Destination Country'),
+    'Most_Attacks_Outgoing.png': TopBarChart('Most Attacks Outgoing by Country (Top 10)',
+                                             'Number of Attacks', 'Source Country')
+}
+
+
+def aggregate_attacks(attacks):
+    """
+    Sums hits per distinct (severity, type, dest, src) record rather than
+    expanding one row per attack, so memory tracks distinct records.
+    Records are consumed one at a time, so attacks can be a stream.
+
+    Returns:
+        DataFrame: One row per distinct record with a 'count' column, or
+                   None if no record has any hits.
+    """
+    attack_counts = {}
+    for attack in attacks:
+        count = attack.get('count', 0)
+        if count == 0:
+            continue
+        key = (
+            attack.get('severity', 'Unknown'),
+            attack.get('profile_type', 'Unknown'),
+            attack.get('dest_country', 'Unknown'),
+            attack.get('src_country', 'Unknown')
+        )
+        attack_counts[key] = attack_counts.get(key, 0) + count
+
+
+    if not attack_counts:
+        return None
 
 
-output_dir = "DashboardServer\static\Images"
-chart_files = [
-    'Attack_Severity.png',
-    'Attack_Types.png',
-    'Most_Attacks_Incoming.png',
-    'Most_Attacks_Outgoing.png'
-]
+    df_attacks = pd.DataFrame(
+        [key + (count,) for key, count in attack_counts.items()],
+        columns=['severity', 'profile_type', 'dest_country', 'src_country', 'count']
+    )
+    return df_attacks
 
 
 def fetch_and_process_data():
-    url = "https://fortiguard.fortinet.com/api/threatmap/live/outbreak?outbreak_id=0&segment_sec=300&last_sec=3600&replay=true&limit=500"
-
-
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-
-    try:
-        response = requests.get(url, timeout=30, verify=False)
-        response.raise_for_status()
-        data = response.json()
-
-
-        ips_data = data.get('ips', {})
+    # Records are streamed from the payload rather than loaded all at once
+    return aggregate_attacks(fetch_threat_items())
 
 
-        all_attacks = []
-        for timestamp_key, attacks in ips_data.items():
-            for attack in attacks:
-                count = attack.get('count', 0)
-                if count == 0:
-                    continue
-                for _ in range(count):
-                    all_attacks.append({
-                        'severity': attack.get('severity', 'Unknown'),
-                        'profile_type': attack.get('profile_type', 'Unknown'),
-                        'dest_country': attack.get('dest_country', 'Unknown'),
-                        'src_country': attack.get('src_country', 'Unknown')
-                    })
+def weighted_counts(df_attacks, column):
+    # Equivalent of value_counts() on the expanded rows, weighted by 'count'
+    return (df_attacks.groupby(column, sort=False)['count'].sum()
+            .sort_values(ascending=False, kind='stable'))
 
 
-        if not all_attacks:
-            return None
+def publish_distributions(df_attacks):
+    distributions = {}
+    for column in ['severity', 'profile_type', 'dest_country', 'src_country']:
+        counts = weighted_counts(df_attacks, column)
+        distributions[column] = {str(key): int(value) for key, value in counts.items()}
+    store.update("fortinet", "distributions", distributions)
 
 
-        df_attacks = pd.DataFrame(all_attacks)
-        return df_attacks
-
-
-    except Exception:
-        return None
-
+def generate_charts(df_attacks):
+    chart_counts = {
+        'Attack_Severity.png': weighted_counts(df_attacks, 'severity'),
+        'Attack_Types.png': weighted_counts(df_attacks, 'profile_type'),
+        'Most_Attacks_Incoming.png': weighted_counts(df_attacks, 'dest_country').head(10),
+        'Most_Attacks_Outgoing.png': weighted_counts(df_attacks, 'src_country').head(10)
+    }
 
-def delete_old_charts():
-    for file in chart_files:
-        path = os.path.join(output_dir, file)
-        if os.path.exists(path):
-            try:
-                os.remove(path)
-            except Exception:
-                pass
+    # Charts whose counts match the last render are neither redrawn nor rewritten
+    for file, counts in chart_counts.items():
+        charts[file].render(os.path.join(output_dir, file), counts)
 
 
-def generate_charts(df_attacks):
-    try:
-        plt.figure(figsize=(6,6))
-        df_attacks['severity'].value_counts().plot.pie(autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
-        plt.title('Attack Severity Distribution')
-        plt.ylabel('')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'Attack_Severity.png'))
-        plt.close()
-
-
-        plt.figure(figsize=(6,6))
-        df_attacks['profile_type'].value_counts().plot.pie(autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
-        plt.title('Attack Types Distribution')
-        plt.ylabel('')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'Attack_Types.png'))
-        plt.close()
-
-
-        plt.figure(figsize=(10,6))
-        sns.barplot(x=df_attacks['dest_country'].value_counts().head(10).values,
-                    y=df_attacks['dest_country'].value_counts().head(10).index,
-                    palette="viridis")
-        plt.title('Most Attacks Incoming by Country (Top 10)')
-        plt.xlabel('Number of Attacks')
-        plt.ylabel('Destination Country')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'Most_Attacks_Incoming.png'))
-        plt.close()
-
-
-        plt.figure(figsize=(10,6))
-        sns.barplot(x=df_attacks['src_country'].value_counts().head(10).values,
-                    y=df_attacks['src_country'].value_counts().head(10).index,
-                    palette="viridis")
-        plt.title('Most Attacks Outgoing by Country (Top 10)')
-        plt.xlabel('Number of Attacks')
-        plt.ylabel('Source Country')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'Most_Attacks_Outgoing.png'))
-        plt.close()
-
-
-    except Exception:
-        pass
+def run_cycle():
+    """
+    Fetches the threat map, publishes its distributions and redraws the
+    charts. Fetch, parse and render errors propagate to the caller.
+    """
+    df_attacks = fetch_and_process_data()
+    if df_attacks is not None:
+        publish_distributions(df_attacks)
+        generate_charts(df_attacks)
 
 
 if __name__ == '__main__':
     while True:
-        df_attacks = fetch_and_process_data()
-        if df_attacks is not None:
-            delete_old_charts()
-            generate_charts(df_attacks)
+        try:
+            run_cycle()
+        except Exception as e:
+            print(f"[ERROR] Fortiscraper cycle failed: {e}")
         print("Fortiscraper sleeping 1 minute")
         time.sleep(60)  # Wait 1 minute before next fetch
 
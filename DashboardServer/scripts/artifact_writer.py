@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+# os.replace can briefly fail on Windows while a reader holds the target open
+REPLACE_ATTEMPTS = 5
+REPLACE_RETRY_DELAY = 0.05  # seconds
+
+
+def _replace(tmp_path, path):
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+
+@contextmanager
+def atomic_write(path, mode="w", encoding="utf-8"):
+    """
+    Opens a temporary file next to path for writing and, once the block
+    exits cleanly, atomically renames it over path. Readers always see
+    either the previous complete file or the new one, never a missing or
+    half-written file. If the block raises, path is left untouched.
+
+    Args:
+        path (str): The file to (re)write.
+        mode (str): "w" for text or "wb" for binary.
+        encoding (str): Text encoding, ignored in binary mode.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_text(path, text):
+    with atomic_write(path) as f:
+        f.write(text)
+
+
+def write_json(path, data):
+    with atomic_write(path) as f:
+        json.dump(data, f)
+
+
+def save_figure(figure, path):
+    """Saves a matplotlib Figure atomically, inferring the format from the extension."""
+    image_format = os.path.splitext(path)[1].lstrip(".") or "png"
+    with atomic_write(path, "wb") as f:
+        figure.savefig(f, format=image_format)
@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import urllib3
+
+from artifact_writer import atomic_write, write_json
+from http_client import client
+
+# Disable SSL certificate warnings when using verify=False
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# --- Configuration ---
+DASHBOARD_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# {url: {"sha256": "<hex>", "sha384": "sha384-<base64>"}}; either digest may be omitted
+MANIFEST_PATH = os.path.join(DASHBOARD_DIRECTORY, "asset_manifest.json")
+# The single-asset hash file the manifest replaces, still read if no manifest exists
+LEGACY_HASH_PATH = os.path.join(DASHBOARD_DIRECTORY, "tailwind_hash.txt")
+LEGACY_HASH_URL = "https://cdn.tailwindcss.com?version=3.4.3"
+# ETag / Last-Modified and digests of the last body seen per asset
+VALIDATORS_PATH = os.path.join(DASHBOARD_DIRECTORY, "data", "asset_validators.json")
+ALGORITHMS = ("sha256", "sha384")
+CHUNK_SIZE = 64 * 1024
+MAX_WORKERS = 8
+TIMEOUT = 10
+
+
+def load_manifest(path=MANIFEST_PATH, legacy_path=LEGACY_HASH_PATH):
+    """
+    Reads the asset manifest. Without one, falls back to the legacy
+    tailwind_hash.txt as a one-entry manifest.
+
+    Returns:
+        dict: {url: {algorithm: expected digest}}, empty if neither file exists.
+
+    Raises:
+        ValueError: If the manifest is not valid JSON.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            known_good_hash = f.read().strip()
+    except FileNotFoundError:
+        return {}
+    return {LEGACY_HASH_URL: {"sha256": known_good_hash}} if known_good_hash else {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    with atomic_write(path) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def stream_digests(response):
+    """
+    Hashes a streamed response body chunk by chunk as it arrives, so memory
+    stays constant whatever the size of the body.
+
+    Returns:
+        dict: {"sha256": hex digest, "sha384": SRI string, "bytes": body size}
+    """
+    hashers = {algorithm: hashlib.new(algorithm) for algorithm in ALGORITHMS}
+    size = 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        size += len(chunk)
+        for hasher in hashers.values():
+            hasher.update(chunk)
+    return {
+        "sha256": hashers["sha256"].hexdigest(),
+        "sha384": "sha384-" + base64.b64encode(hashers["sha384"].digest()).decode("ascii"),
+        "bytes": size,
+    }
+
+
+def hash_asset(url, timeout=TIMEOUT):
+    """
+    Downloads url as a stream and returns its digests (see stream_digests).
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails.
+    """
+    with client.get(url, timeout=timeout, verify=False, stream=True) as response:
+        response.raise_for_status()
+        return stream_digests(response)
+
+
+def hash_assets(urls, max_workers=MAX_WORKERS):
+    """Hashes several assets in parallel. Returns {url: digests or the exception raised}."""
+    def hash_one(url):
+        try:
+            return hash_asset(url)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+        return dict(zip(urls, executor.map(hash_one, urls)))
+
+
+def _matches(expected, current):
+    """True if every expected digest matches. sha256 may be hex or SRI; sha384 is SRI."""
+    for algorithm, value in expected.items():
+        if algorithm not in ALGORITHMS:
+            continue
+        accepted = {current[algorithm]}
+        if algorithm == "sha256":
+            raw = bytes.fromhex(current["sha256"])
+            accepted.add("sha256-" + base64.b64encode(raw).decode("ascii"))
+        if value not in accepted:
+            return False
+    return True
+
+
+class AssetVerifier:
+    """
+    Verifies assets against their expected digests.
+
+    The body is hashed as it streams in and never held in memory. The ETag
+    and Last-Modified of each asset are remembered (and persisted) together
+    with the digests of the body they belong to, so a later check sends a
+    conditional request and an unchanged asset costs a 304 instead of a
+    full download.
+    """
+
+    def __init__(self, validators_path=VALIDATORS_PATH):
+        self.validators_path = validators_path
+        self._lock = threading.Lock()
+        try:
+            with open(validators_path, "r", encoding="utf-8") as f:
+                self._validators = json.load(f)
+        except (OSError, ValueError):
+            self._validators = {}
+
+    def _conditional_headers(self, url):
+        with self._lock:
+            seen = self._validators.get(url)
+        headers = {}
+        if seen:
+            if seen.get("etag"):
+                headers["If-None-Match"] = seen["etag"]
+            if seen.get("last_modified"):
+                headers["If-Modified-Since"] = seen["last_modified"]
+        return headers
+
+    def _remember(self, url, response, digests):
+        with self._lock:
+            self._validators[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "digests": digests,
+            }
+            write_json(self.validators_path, self._validators)
+
+    def verify(self, url, expected, timeout=TIMEOUT):
+        """
+        Checks url against its expected digests.
+
+        Returns:
+            tuple: (status, message, details) where status is "OK" or "FAIL"
+                   and details holds the expected and current digests and
+                   whether the body was downloaded.
+        """
+        if not any(algorithm in expected for algorithm in ALGORITHMS):
+            return "FAIL", f"No sha256 or sha384 digest in the manifest for {url}", {}
+
+        try:
+            # verify=False matches the previous check; remove once the CDN chain verifies here
+            with client.get(url, headers=self._conditional_headers(url), timeout=timeout,
+                              verify=False, stream=True) as response:
+                if response.status_code == 304:
+                    with self._lock:
+                        current = self._validators[url]["digests"]
+                    downloaded = False
+                else:
+                    response.raise_for_status()
+                    current = stream_digests(response)
+                    downloaded = True
+                    self._remember(url, response, current)
+        except requests.exceptions.RequestException as e:
+            return "FAIL", f"Could not download the file: {e}", {}
+
+        details = {"expected": expected, "current": current, "downloaded": downloaded}
+        if _matches(expected, current):
+            suffix = "" if downloaded else " (unchanged since last download)"
+            return "OK", f"Hash matches the manifest{suffix}.", details
+        return "FAIL", "Hash mismatch! The file may be compromised.", details
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from artifact_writer import save_figure, write_text
+
+# seaborn's "pastel" palette, kept here so rendering needs no seaborn styling
+PASTEL = ["#A1C9F4", "#FFB482", "#8DE5A1", "#FF9F9B", "#D0BBFF",
+          "#DEBB9B", "#FAB0E4", "#CFCFCF", "#FFFEA3", "#B9F2F0"]
+
+# seaborn's darkgrid background
+DARKGRID_FACE = "#EAEAF2"
+
+
+def viridis_palette(n):
+    """Same sampling as sns.color_palette("viridis", n): evenly spaced, ends excluded."""
+    return colormaps["viridis"](np.linspace(0, 1, n + 2)[1:-1])
+
+
+def fingerprint(counts):
+    """Hash of a value-count Series, independent of the order of its entries."""
+    items = sorted((str(label), float(value)) for label, value in counts.items())
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+def fingerprint_path(image_path):
+    return image_path + ".fingerprint"
+
+
+def is_current(image_path, digest):
+    """True if image_path exists and was rendered from data with this fingerprint."""
+    if not os.path.exists(image_path):
+        return False
+    try:
+        with open(fingerprint_path(image_path), "r", encoding="utf-8") as f:
+            return f.read().strip() == digest
+    except OSError:
+        return False
+
+
+def write_fingerprint(image_path, digest):
+    write_text(fingerprint_path(image_path), digest)
+
+
+class Chart:
+    """
+    A persistent Figure/Axes pair rendered through the Agg canvas.
+
+    Subclasses build their artists once and afterwards only update artist
+    data, so no pyplot global state is touched and figures are reused
+    across cycles.
+    """
+
+    def __init__(self, figsize):
+        self.figure = Figure(figsize=figsize, layout="tight")
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+    def save(self, path):
+        save_figure(self.figure, path)
+
+    def render(self, path, counts):
+        """
+        Updates the chart from counts and saves it to path, unless the image
+        there was already rendered from identical counts. Skipping leaves the
+        file, its mtime and its ETag untouched.
+
+        Returns:
+            bool: True if the image was written.
+        """
+        digest = fingerprint(counts)
+        if is_current(path, digest):
+            return False
+        self.update(counts)
+        self.save(path)
+        write_fingerprint(path, digest)
+        return True
+
+
+class PieChart(Chart):
+    """Pie chart of a value-count Series, labelled with percentages."""
+
+    START_ANGLE = 140
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self, title, figsize=(6, 6)):
+        super().__init__(figsize)
+        self.title = title
+        self._labels = None
+
+    def update(self, counts):
+        labels = [str(label) for label in counts.index]
+        values = np.asarray(counts.values, dtype=float)
+        if labels != self._labels:
+            self._build(labels, values)
+            return
+
+        # Same layout matplotlib's pie() uses, applied to the existing artists
+        theta1 = self.START_ANGLE / 360
+        for wedge, text, autotext, frac in zip(self._wedges, self._texts, self._autotexts, values / values.sum()):
+            theta2 = theta1 + frac
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            thetam = math.pi * (theta1 + theta2)
+            x, y = math.cos(thetam), math.sin(thetam)
+            text.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            autotext.set_text(f"{100 * frac:.1f}%")
+            theta1 = theta2
+
+    def _build(self, labels, values):
+        self.ax.clear()
+        self._wedges, self._texts, self._autotexts = self.ax.pie(
+            values, labels=labels, autopct='%1.1f%%', startangle=self.START_ANGLE,
+            colors=PASTEL, labeldistance=self.LABEL_DISTANCE, pctdistance=self.PCT_DISTANCE)
+        self.ax.set_title(self.title)
+        self._labels = labels
+
+
+class TopBarChart(Chart):
+    """Horizontal bar chart of the largest counts, biggest at the top."""
+
+    def __init__(self, title, xlabel, ylabel, figsize=(10, 6)):
+        super().__init__(figsize)
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self._bars = None
+
+    def update(self, counts):
+        labels = [str(label) for label in counts.index]
+        values = np.asarray(counts.values, dtype=float)
+        if self._bars is None or len(self._bars) != len(values):
+            self._build(len(values))
+
+        for bar, value in zip(self._bars, values):
+            bar.set_width(value)
+        self.ax.set_yticks(range(len(labels)), labels)
+        self.ax.set_xlim(0, values.max() * 1.05 if len(values) else 1)
+
+    def _build(self, n):
+        self.ax.clear()
+        self._bars = self.ax.barh(range(n), np.zeros(n), color=viridis_palette(n))
+        self.ax.invert_yaxis()
+        self.ax.set_title(self.title)
+        self.ax.set_xlabel(self.xlabel)
+        self.ax.set_ylabel(self.ylabel)
+
+
+class TrendChart(Chart):
+    """Attack counts and their rolling average over the last 12 hours."""
+
+    def __init__(self, figsize=(12, 7)):
+        super().__init__(figsize)
+        ax = self.ax
+        ax.set_facecolor(DARKGRID_FACE)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        self._attacks_line, = ax.plot([], [], label='Attacks')
+        self._average_line, = ax.plot([], [], label='Rolling Average (1h)', color='orange')
+
+        ax.grid(True, which='both', axis='both', color='white', linestyle='--', linewidth=0.7, alpha=0.7)
+        ax.set_xlim(-12, 0)
+        ax.set_xticks([-12, -9, -6, -3, 0])
+        ax.set_xticklabels(['-12 Hours', '-9', '-6', '-3', '0 Hours'])
+        ax.set_title('Real-time Cyberattack Trends')
+        ax.set_xlabel('Hours Ago')
+        ax.set_ylabel('Number of Attacks')
+        ax.legend(title='Legend', loc='upper left', fontsize='medium')
+
+    def update(self, relative_hours, attacks, rolling_average):
+        self._attacks_line.set_data(relative_hours, attacks)
+        self._average_line.set_data(relative_hours, rolling_average)
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=False)
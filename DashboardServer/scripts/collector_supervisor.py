@@ -0,0 +1,137 @@
+import importlib
+import logging
+import threading
+import time
+
+import matplotlib
+matplotlib.use("Agg")  # Charts are rendered off the main thread, never shown
+
+# --- Configuration ---
+# (job name, module, cycle function, interval in seconds)
+COLLECTOR_JOBS = [
+    ("threat_scrape", "Fortiscraper3", "run_cycle", 60),
+    ("history", "Fortinet_Attack_History", "job", 30 * 60),
+    ("down_detector", "down_detector", "main", 60),
+    ("news", "news", "update_feeds", 30 * 60),
+]
+BASE_BACKOFF = 5  # seconds before the first retry of a failed job
+MAX_BACKOFF = 10 * 60
+
+
+class Job:
+    """A collector cycle run on a fixed interval, with run-time metrics."""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_duration = None
+        self.total_duration = 0.0
+        self.last_success = None
+        self.last_error = None
+
+    def metrics(self):
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_duration": self.last_duration,
+            "average_duration": self.total_duration / self.runs if self.runs else None,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "next_run_in": max(0.0, self.next_run - time.monotonic()),
+        }
+
+
+class CollectorSupervisor:
+    """
+    Runs every collector job on one worker thread in this process.
+
+    A cycle function reports a failed cycle by raising, even when it has
+    published part of its data. A job that raises is retried with
+    exponential backoff (capped at its normal interval and MAX_BACKOFF)
+    instead of killing the worker, so one broken collector never stops the
+    others.
+    """
+
+    def __init__(self, jobs, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.jobs = jobs
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="collector-supervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def run_now(self, name):
+        """Schedules the named job to run as soon as the worker is free."""
+        for job in self.jobs:
+            if job.name == name:
+                job.next_run = 0.0
+                self._wakeup.set()
+                return True
+        return False
+
+    def metrics(self):
+        return [job.metrics() for job in self.jobs]
+
+    def run_forever(self):
+        while not self._stopped.is_set():
+            job = min(self.jobs, key=lambda j: j.next_run)
+            delay = job.next_run - time.monotonic()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        logging.info(f"Running collector job: {job.name}")
+        start = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            job.failures += 1
+            job.consecutive_failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            backoff = min(self.base_backoff * 2 ** (job.consecutive_failures - 1), job.interval, self.max_backoff)
+            job.next_run = time.monotonic() + backoff
+            logging.exception(f"Collector job {job.name} failed; retrying in {backoff:.0f}s")
+        else:
+            job.consecutive_failures = 0
+            job.last_success = time.time()
+            job.next_run = time.monotonic() + job.interval
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - start
+            job.total_duration += job.last_duration
+
+
+def build_jobs(job_specs=COLLECTOR_JOBS):
+    """
+    Imports each collector module once and returns its Job. A module that
+    cannot be imported is logged and left out rather than stopping the rest.
+    """
+    jobs = []
+    for name, module_name, func_name, interval in job_specs:
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            logging.error(f"Could not load collector {module_name}: {e}")
+            continue
+        jobs.append(Job(name, getattr(module, func_name), interval))
+    return jobs
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+
+from artifact_writer import write_json
+
+# --- Configuration ---
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Each view the dashboard serves and the snapshot file that backs it
+VIEWS = {
+    "news": "news_data.json",
+    "down_detector": "down_detector_data.json",
+    "fortinet": "fortinet_data.json",
+}
+
+
+class DashboardStore:
+    """
+    In-process store for the data behind each dashboard view.
+
+    Collectors call update() and the web app reads with get(). Every update
+    bumps the view's version and is persisted as a JSON snapshot in
+    DATA_DIRECTORY, so a collector running in another process is picked up
+    on the reader's next get() without re-reading unchanged snapshots.
+    """
+
+    def __init__(self, data_dir=DATA_DIRECTORY):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._views = {view: {"version": 0, "updated_at": None, "data": {}} for view in VIEWS}
+        self._mtimes = {}
+
+    def _snapshot_path(self, view):
+        return os.path.join(self.data_dir, VIEWS[view])
+
+    def _persist(self, view):
+        path = self._snapshot_path(view)
+        write_json(path, self._views[view])
+        self._mtimes[view] = os.stat(path).st_mtime_ns
+
+    def _refresh(self, view):
+        """Reloads a view from its snapshot if another process has written it."""
+        try:
+            mtime = os.stat(self._snapshot_path(view)).st_mtime_ns
+        except OSError:
+            return
+        if self._mtimes.get(view) == mtime:
+            return
+        try:
+            with open(self._snapshot_path(view), "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._views[view] = snapshot
+        self._mtimes[view] = mtime
+
+    def update(self, view, key, value):
+        """
+        Sets one entry of a view (e.g. one news feed) and publishes the change.
+        Setting an entry to its current value is a no-op.
+
+        Raises:
+            KeyError: If view is not one of VIEWS.
+        """
+        if view not in VIEWS:
+            raise KeyError(f"Unknown dashboard view '{view}'")
+        with self._lock:
+            self._refresh(view)
+            if key in self._views[view]["data"] and self._views[view]["data"][key] == value:
+                return  # Unchanged data keeps its version (and ETags) stable
+            # Copy on write so readers holding the previous snapshot are unaffected
+            previous = self._views[view]
+            self._views[view] = {
+                "version": previous["version"] + 1,
+                "updated_at": time.time(),
+                "data": {**previous["data"], key: value}
+            }
+            self._persist(view)
+
+    def get(self, view):
+        """
+        Returns a view's snapshot as a dict with 'version', 'updated_at'
+        (epoch seconds, or None before the first update) and 'data'.
+        The snapshot is shared and must not be modified.
+
+        Raises:
+            KeyError: If view is not one of VIEWS.
+        """
+        if view not in VIEWS:
+            raise KeyError(f"Unknown dashboard view '{view}'")
+        with self._lock:
+            self._refresh(view)
+            return self._views[view]
+
+
+# Shared instance used by the collectors and the web app
+store = DashboardStore()
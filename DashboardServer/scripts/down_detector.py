@@ -1,9 +1,11 @@
 import requests
 import datetime
 import json
-import os
 import time
 import urllib3
+from concurrent.futures import ThreadPoolExecutor, wait
+from dashboard_store import store
+from http_client import client
 
 # Disable SSL certificate warnings when using verify=False
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -23,6 +25,11 @@ def debug(message):
 def error(message):
     log(message, "ERROR")
 
+def api_error(message):
+    """Logs a status API that could not be read and returns the message for the probe to report."""
+    error(message)
+    return message
+
 # --- Configuration ---
 SNOWFLAKE_STATUS_API = "https://status.snowflake.com/api/v2/components.json"
 MICROSOFT_STATUS_API = "https://status.cloud.microsoft/api/posts/m365Consumer"
@@ -35,16 +42,25 @@ FORTINET_APIS = [
 ]
 WEBSITES_TO_CHECK = []
 
-OUTPUT_DIRECTORY = "DashboardServer/templates/DownDetector"
-FILE_NAME = "Down_Detector_Test.html"
+# --- Concurrency ---
+CYCLE_DEADLINE = 45  # seconds; probes still running after this are reported as stale
+MAX_WORKERS = 32
+STALE_SUFFIX = "\\n(Stale: no response before the cycle deadline)"
+
+# Long-lived pool so a slow probe never holds up the next cycle's report
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+_last_results = {}  # probe key -> last completed result, reused when a probe misses the deadline
+_in_flight = {}  # probe key -> its future, until it finishes or is cancelled
+_finished_at = {}  # probe key -> when it last finished; the stalest probes are submitted first
 
 # --- Core Functions ---
 
 def get_status_from_snowflake_api(api_url):
     debug(f"Fetching Snowflake status from {api_url}")
     categorized_components = {"snowflake": [], "aws": [], "azure": []}
+    failure = None
     try:
-        response = requests.get(api_url, timeout=10, verify=False)
+        response = client.get(api_url, timeout=10, verify=False)
         debug(f"Snowflake API response code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -75,36 +91,38 @@ def get_status_from_snowflake_api(api_url):
                 categorized_components[category].append(formatted_component)
 
     except requests.exceptions.RequestException as e:
-        error(f"Error fetching data from Snowflake API: {e}")
+        failure = api_error(f"Error fetching data from Snowflake API: {e}")
     except json.JSONDecodeError:
-        error("Error decoding JSON from Snowflake API response.")
+        failure = api_error("Error decoding JSON from Snowflake API response.")
 
-    return categorized_components
+    return categorized_components, failure
 
 def check_website_status(url):
     debug(f"Checking website: {url}")
     try:
-        response = requests.get(url, timeout=5, verify=False)
+        response = client.get(url, timeout=5, verify=False)
         debug(f"Website {url} responded with {response.status_code}")
 
         if 200 <= response.status_code < 300:
             return {"service": url, "status": "Running",
-                    "message": f"Status Code: {response.status_code}", "category": "websites"}
+                    "message": f"Status Code: {response.status_code}", "category": "websites"}, None
         else:
             return {"service": url, "status": "Not Running",
-                    "message": f"Status Code: {response.status_code}", "category": "websites"}
+                    "message": f"Status Code: {response.status_code}", "category": "websites"}, None
     except requests.exceptions.RequestException as e:
+        # A site that cannot be reached is reported as down, not as a failed status source
         error(f"Website error: {url} => {e}")
         return {"service": url, "status": "Not Running",
-                "message": f"Error: {e}", "category": "websites"}
+                "message": f"Error: {e}", "category": "websites"}, None
 
 def check_microsoft_status(api_url):
     debug(f"Fetching Microsoft 365 status from {api_url}")
     results = []
+    failure = None
     SERVICES_TO_INCLUDE = ["Microsoft 365 (Consumer)", "Microsoft Copilot", "Outlook.com"]
 
     try:
-        response = requests.get(api_url, timeout=10, verify=False)
+        response = client.get(api_url, timeout=10, verify=False)
         debug(f"Microsoft API status code: {response.status_code}")
         response.raise_for_status()
         services = response.json()
@@ -136,21 +154,22 @@ def check_microsoft_status(api_url):
                 })
 
     except requests.exceptions.RequestException as e:
-        error(f"Error fetching Microsoft API: {e}")
+        failure = api_error(f"Error fetching Microsoft API: {e}")
         results.append({"service": "Microsoft 365 Status API", "status": "Not Running",
                         "message": f"Error fetching API data: {e}", "category": "microsoft"})
     except json.JSONDecodeError:
-        error("Error decoding JSON from Microsoft API response.")
+        failure = api_error("Error decoding JSON from Microsoft API response.")
         results.append({"service": "Microsoft 365 Status API", "status": "Not Running",
                         "message": "Error decoding JSON response", "category": "microsoft"})
 
-    return results
+    return results, failure
 
 def get_fortinet_status(api_data):
     debug(f"Fetching Fortinet data: {api_data['name']} from {api_data['url']}")
     results = []
+    failure = None
     try:
-        response = requests.get(api_data["url"], timeout=10, verify=False)
+        response = client.get(api_data["url"], timeout=10, verify=False)
         debug(f"{api_data['name']} API status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -167,112 +186,135 @@ def get_fortinet_status(api_data):
                     "category": "fortinet"
                 })
     except requests.exceptions.RequestException as e:
-        error(f"Fortinet error: {api_data['name']} => {e}")
+        failure = api_error(f"Fortinet error: {api_data['name']} => {e}")
         results.append({"service": f"{api_data['name']} Status API", "status": "Not Running",
                         "message": f"Error fetching API data: {e}", "category": "fortinet"})
     except json.JSONDecodeError:
-        error(f"Error decoding JSON from Fortinet {api_data['name']}")
+        failure = api_error(f"Error decoding JSON from Fortinet {api_data['name']}")
         results.append({"service": f"{api_data['name']} Status API", "status": "Not Running",
                         "message": "Error decoding JSON response", "category": "fortinet"})
 
-    return results
-
-def generate_html_report(results):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Comprehensive IT Status Report</title>
-<script src="https://cdn.tailwindcss.com?version=3.4.3"></script>
-<style>
-    body {{ font-family: 'Inter', sans-serif; }}
-    .section-header {{
-        background-color: #2f4132;
-        padding: 0.75rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-        font-weight: 600;
-        color: #cad4cb;
-    }}
-</style>
-</head>
-<body class="bg-[#202522] flex items-center justify-center min-h-screen p-4">
-    <div class="bg-[#2f4132] p-8 rounded-2xl shadow-xl w-full max-w-4xl border border-[#00bf1d]">
-        <h1 class="text-3xl font-bold text-[#cad4cb] text-center">IT Status Report</h1>
-        <p class="text-sm text-center text-[#a2a2a2] mt-2">
-            Report generated on: <span class="font-semibold text-[#d0d8ce]">{timestamp}</span>
-        </p>
-        <div class="mt-6 space-y-4">
-"""
-
-    def generate_card(item):
-        if item["status"] == "Running":
-            status_color = "border-green-500"
-            status_text_color = "text-[#cad4cb]"
-            status_icon = "✅"
-        elif item["status"] == "Service Restored":
-            status_color = "border-orange-500"
-            status_text_color = "text-orange-400"
-            status_icon = "🟠"
-        else:  # Not Running
-            status_color = "border-red-500"
-            status_text_color = "text-red-500"
-            status_icon = "❌"
-
-        message_html = item["message"].replace("\\n", "<br>")
-
-        return f"""
-        <div class="flex items-center p-4 rounded-xl shadow-md bg-[#2f4132] border-2 {status_color}">
-            <div class="flex-shrink-0 text-3xl mr-4">{status_icon}</div>
-            <div class="flex-grow">
-                <div class="flex justify-between items-center mb-1">
-                    <span class="font-bold text-lg leading-tight break-all text-[#d0d8ce]">{item["service"]}</span>
-                    <span class="font-semibold text-sm rounded-full px-3 py-1 ml-4 whitespace-nowrap bg-[#202522] {status_text_color}">{item["status"]}</span>
-                </div>
-                <p class="text-sm opacity-80 break-words text-[#a2a2a2]">{message_html}</p>
-            </div>
-        </div>
-        """
-
-    for _, items in [
-        ("Websites", results.get("websites", [])),
-        ("Microsoft", results.get("microsoft", [])),
-        ("Fortinet", results.get("fortinet", [])),
-        ("Snowflake", results.get("snowflake", []))
-    ]:
-        if items:
-            for item in items:
-                html_content += generate_card(item)
-
-    html_content += "</div></div></body></html>"
-    return html_content
+    return results, failure
+
+def _record_result(key, future):
+    """Keeps the result of a probe that finishes after its cycle has reported."""
+    if not future.cancelled():
+        _finished_at[key] = time.monotonic()
+        if future.exception() is None:
+            _last_results[key] = future.result()[0]
+
+def collect_statuses(probes, deadline=CYCLE_DEADLINE):
+    """
+    Runs every probe concurrently and waits at most `deadline` seconds.
+
+    Args:
+        probes (dict): Maps a probe key to a (function, argument) pair;
+                       function(argument) returns (result, error message or None).
+        deadline (float): Overall time budget for the cycle in seconds.
+
+    Returns:
+        tuple: (results, stale, errors) where results maps each probe key to
+               its result (the last completed one for probes that missed the
+               deadline, or None if there is none), stale is the set of keys
+               whose result did not come from this cycle and errors lists the
+               error messages of the probes harvested this cycle.
+
+    Probes that have not started by the deadline are cancelled, and the
+    ones that waited longest go first next cycle. One that is still
+    running is left to finish (its result is kept for the next cycle) and
+    is not submitted again until it has.
+    """
+    futures = {}
+    for key in sorted(probes, key=lambda key: _finished_at.get(key, 0)):
+        func, arg = probes[key]
+        future = _in_flight.get(key)
+        if future is None or future.done():
+            # A probe still running from an earlier cycle is waited on, not submitted again
+            future = _executor.submit(func, arg)
+            future.add_done_callback(lambda f, key=key: _record_result(key, f))
+            _in_flight[key] = future
+        futures[future] = key
+    done, not_done = wait(futures, timeout=deadline)
+
+    results = {}
+    stale = set()
+    errors = []
+    for future in done:
+        key = futures[future]
+        try:
+            results[key], failure = future.result()
+            _last_results[key] = results[key]
+            if failure is not None:
+                errors.append(failure)
+        except Exception as e:
+            error(f"Probe {key} failed: {e}")
+            results[key] = _last_results.get(key)
+            stale.add(key)
+
+    for future in not_done:
+        key = futures[future]
+        # Queued probes are dropped so the backlog cannot grow from cycle to cycle
+        if future.cancel():
+            _in_flight.pop(key, None)
+        error(f"Probe {key} missed the {deadline}s cycle deadline")
+        results[key] = _last_results.get(key)
+        stale.add(key)
+
+    return results, stale, errors
+
+def mark_stale(item):
+    stale_item = dict(item, stale=True)
+    stale_item["message"] = item["message"] + STALE_SUFFIX
+    return stale_item
 
 def main():
+    """
+    Runs one status check cycle and publishes the report.
+
+    Raises:
+        RuntimeError: If a status API could not be read or a probe missed
+                      the deadline; the report is still published, with
+                      those entries marked down or stale.
+        OSError: If the report could not be published.
+    """
     debug("Starting new status check cycle")
-    try:
-        os.makedirs(OUTPUT_DIRECTORY, exist_ok=True)
-        debug(f"Output directory checked/created: {OUTPUT_DIRECTORY}")
-    except OSError as e:
-        error(f"Error creating directory {OUTPUT_DIRECTORY}: {e}")
-        return
 
     status_results = {"websites": [], "microsoft": [], "fortinet": [], "snowflake": []}
 
+    # Fan out every probe at once
+    probes = {("website", url): (check_website_status, url) for url in WEBSITES_TO_CHECK}
+    probes[("microsoft",)] = (check_microsoft_status, MICROSOFT_STATUS_API)
+    for api in FORTINET_APIS:
+        probes[("fortinet", api["name"])] = (get_fortinet_status, api)
+    probes[("snowflake",)] = (get_status_from_snowflake_api, SNOWFLAKE_STATUS_API)
+
+    results, stale, errors = collect_statuses(probes)
+
     # Websites
     for url in WEBSITES_TO_CHECK:
-        status_results["websites"].append(check_website_status(url))
-        time.sleep(1)
+        key = ("website", url)
+        result = results.get(key) or {"service": url, "status": "Not Running",
+                                      "message": "Error: no response", "category": "websites"}
+        status_results["websites"].append(mark_stale(result) if key in stale else result)
 
     # Microsoft
-    status_results["microsoft"].extend(check_microsoft_status(MICROSOFT_STATUS_API))
+    microsoft_results = results.get(("microsoft",)) or [
+        {"service": "Microsoft 365 Status API", "status": "Not Running",
+         "message": "Error fetching API data: no response", "category": "microsoft"}]
+    if ("microsoft",) in stale:
+        microsoft_results = [mark_stale(service) for service in microsoft_results]
+    status_results["microsoft"].extend(microsoft_results)
 
     # Fortinet
     fortinet_down_services = []
+    fortinet_stale = False
     for api in FORTINET_APIS:
-        fortinet_results = get_fortinet_status(api)
+        key = ("fortinet", api["name"])
+        fortinet_results = results.get(key)
+        fortinet_stale = fortinet_stale or key in stale
+        if fortinet_results is None:
+            fortinet_down_services.append(f"{api['name']} Status API")
+            continue
         for service in fortinet_results:
             if service["status"] == "Not Running":
                 fortinet_down_services.append(service["service"])
@@ -285,9 +327,15 @@ def main():
         status_results["fortinet"].append({"service": "Fortinet Services", "status": "Running",
                                            "message": "All Fortinet services are operational.", "category": "fortinet"})
 
+    if fortinet_stale:
+        status_results["fortinet"] = [mark_stale(service) for service in status_results["fortinet"]]
+
     # Snowflake
-    snowflake_data = get_status_from_snowflake_api(SNOWFLAKE_STATUS_API)
+    snowflake_data = results.get(("snowflake",))
     snowflake_down_services = []
+    if snowflake_data is None:
+        snowflake_data = {}
+        snowflake_down_services.append("Snowflake Status API")
     for category in ["snowflake", "aws", "azure"]:
         for service in snowflake_data.get(category, []):
             if service["status"] == "Not Running":
@@ -301,19 +349,35 @@ def main():
         status_results["snowflake"].append({"service": "Snowflake Services (includes AWS & Azure)", "status": "Running",
                                            "message": "All Snowflake services and their cloud dependencies are operational.",
                                            "category": "snowflake"})
+    if ("snowflake",) in stale:
+        status_results["snowflake"] = [mark_stale(service) for service in status_results["snowflake"]]
 
-    # Save report
-    full_path = os.path.join(OUTPUT_DIRECTORY, FILE_NAME)
+    # Publish report. An unchanged set of statuses is not republished: a new
+    # generated_at alone would bump the view's version and reload every display.
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(generate_html_report(status_results))
-        debug(f"HTML report written to {full_path}")
-    except IOError as e:
-        error(f"Error writing to file: {e}")
+        previous = store.get("down_detector")["data"].get("report")
+        if previous is not None and previous["results"] == status_results:
+            debug("Statuses unchanged; report not republished")
+        else:
+            store.update("down_detector", "report", {"generated_at": timestamp, "results": status_results})
+            debug("Status report published")
+    except OSError as e:
+        error(f"Error publishing status report: {e}")
+        raise
+
+    # Only this cycle's probes count: one left running from an earlier cycle
+    # reports its error, if any, in the cycle that harvests it
+    if errors or stale:
+        problems = errors + [f"probe {key} is stale" for key in stale]
+        raise RuntimeError(f"{len(problems)} status source(s) failed: {'; '.join(problems)}")
 
 if __name__ == "__main__":
     while True:
-        main()
+        try:
+            main()
+        except (RuntimeError, OSError) as e:
+            error(f"Status check cycle failed: {e}")
         debug("Waiting 60 seconds before next check...")
         print("check in 60s")
         time.sleep(60)
@@ -0,0 +1,127 @@
+import calendar
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# --- Configuration ---
+MAX_ITEMS = 30  # newest entries read from a feed; the rest of the body is never parsed
+MAX_AGE_DAYS = 30  # reading stops at the first entry older than this
+MAX_FEED_BYTES = 5 * 1024 * 1024  # bodies larger than this are abandoned
+CHUNK_SIZE = 16 * 1024
+
+ENTRY_TAGS = {"item", "entry"}  # RSS 0.9x/1.0/2.0 and Atom
+
+
+class FeedTooLarge(Exception):
+    """Raised when a feed body grows past the byte limit before reading finishes."""
+
+
+def _local(tag):
+    """Tag name without its XML namespace."""
+    return tag.rpartition("}")[2]
+
+
+def parse_date(text):
+    """
+    Parses an RFC 822 (RSS) or ISO 8601 (Atom) date.
+
+    Returns:
+        time.struct_time: The date in UTC, like feedparser's *_parsed
+        fields, or None if text is empty or unparseable.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).timetuple()
+
+
+def _text(element):
+    return "".join(element.itertext()).strip()
+
+
+def entry_from_element(element):
+    """
+    Converts an RSS <item> or Atom <entry> element into a dict with the
+    feedparser entry keys the news store reads: id, link, title, summary,
+    published, published_parsed and updated.
+    """
+    fields = {}
+    link = None
+    for child in element:
+        name = _local(child.tag)
+        if name == "link":
+            # Atom links carry the URL in href; the first alternate (or untyped) one wins
+            href = child.get("href")
+            if href is None:
+                link = link or _text(child)
+            elif child.get("rel", "alternate") == "alternate":
+                link = link or href
+        else:
+            fields.setdefault(name, _text(child))
+
+    published = fields.get("pubDate") or fields.get("published") or fields.get("date") or fields.get("updated")
+    return {
+        "id": fields.get("guid") or fields.get("id"),
+        "link": link or "",
+        "title": fields.get("title", ""),
+        "summary": fields.get("description") or fields.get("summary") or fields.get("encoded")
+                   or fields.get("content") or "",
+        "published": published,
+        "published_parsed": parse_date(published),
+        "updated": fields.get("updated"),
+    }
+
+
+def iter_feed_entries(chunks, max_items=MAX_ITEMS, max_age_days=MAX_AGE_DAYS, max_bytes=MAX_FEED_BYTES):
+    """
+    Parses an RSS or Atom body incrementally from an iterable of byte
+    chunks (e.g. response.iter_content) and yields its entries as dicts
+    (see entry_from_element), newest first as feeds list them.
+
+    Reading stops after max_items entries or at the first entry published
+    more than max_age_days ago, so the rest of the body is neither
+    downloaded nor parsed. Each entry is detached from the tree once read,
+    so memory is bounded by the entries kept rather than the feed size.
+
+    Raises:
+        FeedTooLarge: If more than max_bytes arrive before reading stops.
+        xml.etree.ElementTree.ParseError: If the body is not well-formed XML.
+    """
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+    parser = ET.XMLPullParser(events=("start", "end"))
+    open_elements = []
+    size = 0
+    count = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise FeedTooLarge(f"Feed body exceeds {max_bytes} bytes")
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == "start":
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            if _local(element.tag) not in ENTRY_TAGS:
+                continue
+
+            entry = entry_from_element(element)
+            if open_elements:
+                open_elements[-1].remove(element)
+            published = entry["published_parsed"]
+            if cutoff is not None and published and calendar.timegm(published) < cutoff:
+                return
+            yield entry
+            count += 1
+            if count >= max_items:
+                return
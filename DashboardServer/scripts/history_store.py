@@ -0,0 +1,479 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifact_writer import atomic_write, write_json
+
+# --- Configuration ---
+HISTORY_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "data", "attack_history")
+HISTORY_BACKEND = "csv"  # "csv" (text segments) or "numpy" (memory-mapped binary segments)
+RETENTION_HOURS = 12  # raw events
+SEGMENT_MS = 60 * 60 * 1000  # one segment file per hour of data
+DISPLAY_TZ = 'Europe/Jersey'
+
+# Pre-aggregated tiers, finest first: name -> (bucket width, retention), in ms
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+TIERS = {
+    "minute": (MINUTE_MS, 2 * DAY_MS),
+    "hour": (HOUR_MS, 35 * DAY_MS),
+    "day": (DAY_MS, 400 * DAY_MS),
+}
+MAX_QUERY_POINTS = 1500  # a query uses the finest tier that stays within this, and never returns more
+ROLLING_MS = HOUR_MS
+
+# On-disk layout of a binary segment: little-endian epoch ms + attack count
+RECORD_DTYPE = np.dtype([('timestamp_ms', '<i8'), ('attacks', '<i4')])
+
+# On-disk layout of a tier: bucket start + attack sum + row count
+ROLLUP_DTYPE = np.dtype([('start_ms', '<i8'), ('sum', '<i8'), ('count', '<i8')])
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class CsvSegments:
+    """Plain-text segments, one 'timestamp_ms,attacks' row per line."""
+
+    extension = ".csv"
+
+    def read(self, path):
+        try:
+            data = np.loadtxt(path, delimiter=",", dtype=np.int64, ndmin=2)
+        except ValueError:
+            data = np.empty((0, 2), dtype=np.int64)
+        if data.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        return data[:, 0], data[:, 1].astype(np.int32)
+
+    def append(self, path, timestamps_ms, attacks):
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(f"{t},{a}\n" for t, a in zip(timestamps_ms.tolist(), attacks.tolist()))
+
+
+class NumpySegments:
+    """Binary segments of RECORD_DTYPE records, read through a memory map."""
+
+    extension = ".bin"
+
+    def read(self, path):
+        if os.path.getsize(path) < RECORD_DTYPE.itemsize:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r')
+        return records['timestamp_ms'], records['attacks']
+
+    def append(self, path, timestamps_ms, attacks):
+        records = np.empty(len(timestamps_ms), dtype=RECORD_DTYPE)
+        records['timestamp_ms'] = timestamps_ms
+        records['attacks'] = attacks
+        with open(path, "ab") as f:
+            records.tofile(f)
+
+
+BACKENDS = {
+    "csv": CsvSegments,
+    "numpy": NumpySegments,
+}
+
+
+class Rollup:
+    """
+    Attack (sum, count) per fixed-width bucket, kept for the tier's
+    retention and saved as one small binary file of ROLLUP_DTYPE records.
+    """
+
+    def __init__(self, name, bucket_ms, retention_ms, path):
+        self.name = name
+        self.bucket_ms = bucket_ms
+        self.retention_ms = retention_ms
+        self.path = path
+        self.starts = np.empty(0, dtype=np.int64)
+        self.sums = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def load(self):
+        """Reads the tier from disk. Returns False if it has never been saved."""
+        if not os.path.exists(self.path):
+            return False
+        records = np.fromfile(self.path, dtype=ROLLUP_DTYPE)
+        self.starts = records['start_ms'].copy()
+        self.sums = records['sum'].copy()
+        self.counts = records['count'].copy()
+        return True
+
+    def save(self):
+        records = np.empty(len(self.starts), dtype=ROLLUP_DTYPE)
+        records['start_ms'] = self.starts
+        records['sum'] = self.sums
+        records['count'] = self.counts
+        with atomic_write(self.path, "wb") as f:
+            records.tofile(f)
+
+    def add(self, timestamps_ms, attacks):
+        """Folds newly stored rows into their buckets."""
+        starts, inverse = np.unique(timestamps_ms - timestamps_ms % self.bucket_ms, return_inverse=True)
+        sums = np.bincount(inverse, weights=attacks, minlength=len(starts)).astype(np.int64)
+        counts = np.bincount(inverse, minlength=len(starts)).astype(np.int64)
+
+        positions = np.searchsorted(self.starts, starts)
+        known = positions < len(self.starts)
+        known[known] = self.starts[positions[known]] == starts[known]
+        self.sums[positions[known]] += sums[known]
+        self.counts[positions[known]] += counts[known]
+
+        new = ~known
+        self.starts = np.insert(self.starts, positions[new], starts[new])
+        self.sums = np.insert(self.sums, positions[new], sums[new])
+        self.counts = np.insert(self.counts, positions[new], counts[new])
+
+    def trim(self, now):
+        # A bucket goes once every row it holds has expired
+        start = np.searchsorted(self.starts, now - self.retention_ms - self.bucket_ms, side='right')
+        self.starts, self.sums, self.counts = self.starts[start:], self.sums[start:], self.counts[start:]
+
+    def dense(self, grid):
+        """Returns (sums, counts) for every bucket start in grid, zero where empty."""
+        sums = np.zeros(len(grid), dtype=np.int64)
+        counts = np.zeros(len(grid), dtype=np.int64)
+        lo, hi = np.searchsorted(self.starts, [grid[0], grid[-1] + self.bucket_ms])
+        slots = (self.starts[lo:hi] - grid[0]) // self.bucket_ms
+        sums[slots] = self.sums[lo:hi]
+        counts[slots] = self.counts[lo:hi]
+        return sums, counts
+
+
+class HistoryStore:
+    """
+    Append-only time-series store for the attack history.
+
+    Rows are (epoch milliseconds, attacks) pairs keyed by the redis_ms
+    timestamp. They are appended to hourly segment files, and a sorted
+    in-memory index covers the retention window. Expired data is dropped by
+    deleting whole segments, so a write costs only the rows it adds.
+
+    Timestamps stay int64 epoch milliseconds end to end. With the "numpy"
+    backend, segments are memory-mapped, so loading the window needs no
+    text parsing.
+
+    Alongside the raw rows the store keeps minute, hour and day (sum, count)
+    tiers (see TIERS), each with its own retention. They are updated only
+    with the rows each append adds and outlive the raw window, so weeks of
+    trend data cost a fixed number of buckets to store and to query.
+
+    Rows older than the raw window (a long fetch window, a legacy CSV
+    import) still go into the tiers whose retention covers them. They can
+    no longer be checked against the raw index, so the store records the
+    oldest and newest timestamp it has ever taken in (coverage.json) and
+    folds an old row in only if it lies outside that range; fetch windows
+    overlap, so everything inside it has already been counted.
+    """
+
+    def __init__(self, directory=HISTORY_DIRECTORY, retention_hours=RETENTION_HOURS, backend=HISTORY_BACKEND,
+                 tiers=TIERS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown history backend '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+        self.directory = directory
+        self.retention_ms = retention_hours * 60 * 60 * 1000
+        self.segments = BACKENDS[backend]()
+        self._times = np.empty(0, dtype=np.int64)
+        self._attacks = np.empty(0, dtype=np.int32)
+        self.tiers = {
+            name: Rollup(name, bucket_ms, retention_ms, os.path.join(directory, f"rollup_{name}.bin"))
+            for name, (bucket_ms, retention_ms) in tiers.items()
+        }
+        self.coverage_path = os.path.join(directory, "coverage.json")
+        self._coverage = None  # (oldest_ms, newest_ms) of every row ever stored, or None
+        self.version = 0  # bumped whenever append() or trim() changes the stored data
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # --- Segment files ---
+
+    def _segment_start(self, timestamp_ms):
+        return timestamp_ms - timestamp_ms % SEGMENT_MS
+
+    def _segment_path(self, segment_start):
+        return os.path.join(self.directory, f"{segment_start}{self.segments.extension}")
+
+    def _segment_files(self):
+        """Returns (segment_start, path) pairs for every segment on disk."""
+        if not os.path.isdir(self.directory):
+            return []
+        segments = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext == self.segments.extension and stem.isdigit():
+                segments.append((int(stem), os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def _write_rows(self, timestamps_ms, attacks):
+        os.makedirs(self.directory, exist_ok=True)
+        segment_starts = timestamps_ms - timestamps_ms % SEGMENT_MS
+        for segment_start in np.unique(segment_starts):
+            in_segment = segment_starts == segment_start
+            self.segments.append(self._segment_path(int(segment_start)),
+                                 timestamps_ms[in_segment], attacks[in_segment])
+
+    # --- Index ---
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        cutoff = now_ms() - self.retention_ms
+        times, attacks = [], []
+        for segment_start, path in self._segment_files():
+            if segment_start + SEGMENT_MS <= cutoff:
+                continue
+            segment_times, segment_attacks = self.segments.read(path)
+            times.append(segment_times)
+            attacks.append(segment_attacks)
+
+        if times:
+            all_times = np.concatenate(times)
+            all_attacks = np.concatenate(attacks)
+            # np.unique keeps the first occurrence of each timestamp, already sorted
+            self._times, first = np.unique(all_times, return_index=True)
+            self._attacks = all_attacks[first].astype(np.int32)
+            keep = self._times > cutoff
+            self._times, self._attacks = self._times[keep], self._attacks[keep]
+
+        for tier in self.tiers.values():
+            # Tiers saved before they existed on disk are rebuilt from the raw rows
+            if not tier.load() and len(self._times):
+                tier.add(self._times, self._attacks)
+
+        try:
+            with open(self.coverage_path, "r", encoding="utf-8") as f:
+                coverage = json.load(f)
+            self._coverage = (coverage["oldest_ms"], coverage["newest_ms"])
+        except (OSError, ValueError, KeyError):
+            # Stores written before coverage was recorded: the raw rows are all that is known
+            self._coverage = (int(self._times[0]), int(self._times[-1])) if len(self._times) else None
+        self._loaded = True
+
+    def _save_tiers(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for tier in self.tiers.values():
+            tier.save()
+        if self._coverage is not None:
+            write_json(self.coverage_path, {"oldest_ms": self._coverage[0], "newest_ms": self._coverage[1]})
+
+    # --- Public API ---
+
+    def append(self, timestamps_ms, attacks):
+        """
+        Adds rows that are not already stored. The arguments are parallel
+        sequences of epoch-millisecond timestamps and attack counts.
+
+        Rows inside the raw retention window whose timestamp is already
+        known are ignored, matching the old drop_duplicates on timestamp.
+        Older rows skip the raw segments and go only into the tiers whose
+        retention covers them, if they lie outside the range of timestamps
+        already taken in.
+
+        Returns:
+            int: The number of rows added.
+        """
+        timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+        attacks = np.asarray(attacks, dtype=np.int32)
+
+        with self._lock:
+            self._ensure_loaded()
+            now = now_ms()
+            raw_cutoff = now - self.retention_ms
+            oldest_kept = min([raw_cutoff] + [now - tier.retention_ms for tier in self.tiers.values()])
+            keep = timestamps_ms > oldest_kept
+            timestamps_ms, attacks = timestamps_ms[keep], attacks[keep]
+
+            # Drop duplicates within the batch, then anything already taken in
+            timestamps_ms, first = np.unique(timestamps_ms, return_index=True)
+            attacks = attacks[first]
+            recent = timestamps_ms > raw_cutoff
+            positions = np.searchsorted(self._times, timestamps_ms)
+            known = recent & (positions < len(self._times))
+            known[known] = self._times[positions[known]] == timestamps_ms[known]
+            if self._coverage is not None:
+                oldest, newest = self._coverage
+                known |= ~recent & (timestamps_ms >= oldest) & (timestamps_ms <= newest)
+            timestamps_ms, attacks, recent = timestamps_ms[~known], attacks[~known], recent[~known]
+            if len(timestamps_ms) == 0:
+                return 0
+
+            raw_times, raw_attacks = timestamps_ms[recent], attacks[recent]
+            if len(raw_times):
+                self._write_rows(raw_times, raw_attacks)
+                if len(self._times) and raw_times[0] < self._times[-1]:
+                    positions = np.searchsorted(self._times, raw_times)
+                    self._times = np.insert(self._times, positions, raw_times)
+                    self._attacks = np.insert(self._attacks, positions, raw_attacks)
+                else:
+                    self._times = np.concatenate([self._times, raw_times])
+                    self._attacks = np.concatenate([self._attacks, raw_attacks])
+            for tier in self.tiers.values():
+                covered = timestamps_ms > now - tier.retention_ms
+                tier.add(timestamps_ms[covered], attacks[covered])
+
+            oldest, newest = int(timestamps_ms[0]), int(timestamps_ms[-1])
+            if self._coverage is not None:
+                oldest, newest = min(oldest, self._coverage[0]), max(newest, self._coverage[1])
+            self._coverage = (oldest, newest)
+            self._save_tiers()
+            self.version += 1
+            return len(timestamps_ms)
+
+    def trim(self):
+        """
+        Drops raw rows and whole segment files that fell out of the retention
+        window, and tier buckets past their tier's retention.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            now = now_ms()
+            cutoff = now - self.retention_ms
+            start = np.searchsorted(self._times, cutoff, side='right')
+            self._times, self._attacks = self._times[start:], self._attacks[start:]
+            stored = sum(len(tier.starts) for tier in self.tiers.values())
+            for tier in self.tiers.values():
+                tier.trim(now)
+            if start or sum(len(tier.starts) for tier in self.tiers.values()) != stored:
+                self.version += 1
+            if os.path.isdir(self.directory):
+                self._save_tiers()
+            for segment_start, path in self._segment_files():
+                if segment_start + SEGMENT_MS <= cutoff:
+                    os.remove(path)
+
+    def is_empty(self):
+        with self._lock:
+            self._ensure_loaded()
+            return not len(self._times) and not self._segment_files()
+
+    def window_arrays(self, hours=None):
+        """
+        Returns (timestamps_ms, attacks) arrays for the last `hours` hours
+        (default: the whole retention window). The arrays are views of the
+        index, so treat them as read-only.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            window_ms = self.retention_ms if hours is None else int(hours * 60 * 60 * 1000)
+            start = np.searchsorted(self._times, now_ms() - window_ms, side='right')
+            return self._times[start:], self._attacks[start:]
+
+    def resolution_for(self, window_ms):
+        """
+        Returns the name of the finest tier that covers window_ms within its
+        retention in at most MAX_QUERY_POINTS buckets, else the coarsest.
+        """
+        for name, tier in self.tiers.items():
+            if tier.retention_ms >= window_ms and window_ms // tier.bucket_ms <= MAX_QUERY_POINTS:
+                return name
+        return list(self.tiers)[-1]
+
+    def buckets(self, hours=None, resolution=None, rolling_ms=ROLLING_MS):
+        """
+        Returns the buckets covering the last `hours` hours (default: the raw
+        retention window) on a dense grid, one entry per bucket, oldest
+        first. The tier is picked with resolution_for() unless `resolution`
+        names one. The window is capped at the tier's retention and at
+        MAX_QUERY_POINTS buckets, so no query builds a larger grid.
+
+        The rolling average over the trailing `rolling_ms` (at least one
+        bucket) is a running sum of bucket sums divided by a running sum of
+        bucket counts, i.e. the mean attacks per event in that window, like
+        the old rolling('1h') mean over raw rows.
+
+        Returns:
+            dict: 'resolution' (the tier name) plus arrays 'start_ms' (int64
+            bucket starts), 'sum' and 'count' (int64), 'mean' and
+            'rolling_average' (float64, NaN where the bucket or its window
+            holds no rows).
+
+        Raises:
+            ValueError: If hours is not a positive finite number or
+                        resolution is not a known tier.
+        """
+        if hours is not None and not (np.isfinite(hours) and hours > 0):
+            raise ValueError(f"hours must be a positive number, got {hours}")
+        window_ms = self.retention_ms if hours is None else int(hours * 60 * 60 * 1000)
+        if resolution is None:
+            resolution = self.resolution_for(window_ms)
+        if resolution not in self.tiers:
+            raise ValueError(f"Unknown resolution '{resolution}'. Expected one of: {', '.join(self.tiers)}")
+        tier = self.tiers[resolution]
+        width = tier.bucket_ms
+        window_ms = min(window_ms, tier.retention_ms, MAX_QUERY_POINTS * width)
+
+        last = now_ms()
+        last -= last % width
+        points = max(window_ms // width, 1)
+        window = max(rolling_ms // width, 1)
+        lead = window - 1  # buckets before the grid that feed its first averages
+        grid = np.arange(last - (points - 1 + lead) * width, last + 1, width, dtype=np.int64)
+
+        with self._lock:
+            self._ensure_loaded()
+            sums, counts = tier.dense(grid)
+
+        running_sums = np.cumsum(sums)
+        running_counts = np.cumsum(counts)
+        window_sums = running_sums[lead:] - np.concatenate([[0], running_sums[:-window]])
+        window_counts = running_counts[lead:] - np.concatenate([[0], running_counts[:-window]])
+
+        sums, counts = sums[lead:], counts[lead:]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(counts > 0, sums / counts, np.nan)
+            rolling_average = np.where(window_counts > 0, window_sums / window_counts, np.nan)
+        return {
+            'resolution': resolution,
+            'start_ms': grid[lead:],
+            'sum': sums,
+            'count': counts,
+            'mean': mean,
+            'rolling_average': rolling_average,
+        }
+
+    def window(self, hours=None):
+        """
+        Returns the rows from the last `hours` hours as a DataFrame with a
+        tz-aware 'timestamp' column in DISPLAY_TZ and an 'attacks' column.
+        """
+        times, attacks = self.window_arrays(hours)
+        timestamps = pd.to_datetime(times, unit='ms', utc=True).tz_convert(DISPLAY_TZ)
+        return pd.DataFrame({'timestamp': timestamps, 'attacks': attacks.astype(np.int64)})
+
+    def import_csv(self, csv_path):
+        """
+        Imports a legacy cyberattack_data.csv (timestamp, attacks) file.
+        Naive timestamps are taken to be in DISPLAY_TZ, as the old writer did.
+
+        Returns:
+            int: The number of rows imported.
+        """
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            return 0
+        raw = df['timestamp'].astype(str)
+        if raw.str.contains(r'(?:[+-]\d{2}:\d{2}|Z)$').any():
+            timestamps = pd.to_datetime(raw, errors='coerce', utc=True)
+        else:
+            timestamps = pd.to_datetime(raw, errors='coerce').dt.tz_localize(
+                DISPLAY_TZ, ambiguous='NaT', nonexistent='NaT')
+        valid = timestamps.notna()
+        timestamp_ms = (timestamps[valid] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)
+        return self.append(timestamp_ms.to_numpy(), df.loc[valid, 'attacks'].to_numpy())
+
+    def export_csv(self, csv_path, hours=None):
+        """Writes the window in the legacy cyberattack_data.csv (timestamp, attacks) format."""
+        self.window(hours).to_csv(csv_path, index=False)
+
+
+# Shared by the history collector and the web app when they run in one process
+attack_history = HistoryStore()
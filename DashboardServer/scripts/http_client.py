@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Configuration ---
+DEFAULT_POOL_SIZE = 4  # keep-alive connections kept per host
+POOL_SIZES = {}  # host -> pool size, for hosts hit by many threads at once
+TIMEOUT = (5, 10)  # (connect, read) seconds, unless the caller passes its own
+RETRIES = 2  # extra attempts after a connection error, timeout or RETRY_STATUSES
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds; attempt n waits a random time up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 8
+RETRY_METHODS = {"GET", "HEAD"}
+HOSTS_PER_SESSION = 4  # room for redirect targets alongside the session's own host
+
+
+class HostMetrics:
+    """Request counts and response latency for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = None
+
+    def record(self, latency):
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_latency = latency
+
+
+class HttpClient:
+    """
+    Shared HTTP client for the collectors.
+
+    Each host gets its own requests.Session with a keep-alive pool sized
+    from POOL_SIZES, so repeated calls to the same status API reuse one
+    TCP+TLS connection instead of handshaking every time. Idempotent
+    requests that fail with a connection error, a timeout or a
+    RETRY_STATUSES response are retried with full-jitter exponential
+    backoff. Every request has a timeout.
+    """
+
+    def __init__(self, pool_sizes=POOL_SIZES, default_pool_size=DEFAULT_POOL_SIZE, timeout=TIMEOUT,
+                 retries=RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.pool_sizes = pool_sizes
+        self.default_pool_size = default_pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sessions = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def session(self, host):
+        """Returns the pooled session for host, creating it on first use."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                size = self.pool_sizes.get(host, self.default_pool_size)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HOSTS_PER_SESSION, pool_maxsize=size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._metrics[host] = HostMetrics()
+            return session
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, retries=None, **kwargs):
+        """
+        Sends a request over the host's pooled session. Takes the same
+        arguments as requests.request; timeout defaults to TIMEOUT.
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt fails.
+        """
+        host = urlsplit(url).netloc
+        session = self.session(host)
+        metrics = self._metrics[host]
+        kwargs.setdefault("timeout", self.timeout)
+        if retries is None:
+            retries = self.retries if method.upper() in RETRY_METHODS else 0
+
+        attempt = 0
+        while True:
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                with self._lock:
+                    metrics.errors += 1
+                if attempt >= retries:
+                    raise
+            else:
+                with self._lock:
+                    metrics.record(response.elapsed.total_seconds())
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                response.close()
+            with self._lock:
+                metrics.retries += 1
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def metrics(self):
+        """
+        Returns per-host metrics: requests, errors, retries, response
+        latency (time to headers) and how many connections were opened,
+        i.e. TCP+TLS handshakes paid.
+        """
+        with self._lock:
+            hosts = list(self._sessions.items())
+        report = {}
+        for host, session in hosts:
+            connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    try:
+                        connections += pools[key].num_connections
+                    except KeyError:  # evicted since keys() was taken
+                        pass
+            metrics = self._metrics[host]
+            report[host] = {
+                "requests": metrics.requests,
+                "errors": metrics.errors,
+                "retries": metrics.retries,
+                "connections_opened": connections,
+                "average_latency": metrics.total_latency / metrics.requests if metrics.requests else None,
+                "max_latency": metrics.max_latency,
+                "last_latency": metrics.last_latency,
+            }
+        return report
+
+
+# Shared by every collector in the process
+client = HttpClient()
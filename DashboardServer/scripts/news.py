@@ -1,10 +1,18 @@
 import requests
 import feedparser
-import os
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dashboard_store import store
+from http_client import client
+from news_store import news_items
+from feed_stream import CHUNK_SIZE, MAX_AGE_DAYS, MAX_FEED_BYTES, MAX_ITEMS, FeedTooLarge, iter_feed_entries
 
-# A list of the RSS feeds and their corresponding output filenames.
+# A list of the RSS feeds and the dashboard page each one is served on.
+# Optional per-feed keys: "max_items", "max_age_days", "max_bytes" (see
+# feed_stream) and "mode": "stream" (default) reads entries incrementally
+# and stops at those limits; "full" downloads the whole body and hands it
+# to feedparser, for feeds that are not well-formed XML.
 FEEDS = [
     {
         "url": "https://www.bleepingcomputer.com/feed/",
@@ -23,149 +31,172 @@ FEEDS = [
     },
 ]
 
+# The combined page listing every feed's items, newest first.
+ALL_SOURCES = {"filename": "AllSources.html", "title": "All Sources"}
+ALL_SOURCES_LIMIT = 60
+
 # Set a User-Agent header to mimic a web browser and avoid 403 Forbidden errors.
 HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
 
-# The directory where the HTML files will be saved.
-OUTPUT_DIRECTORY = "DashboardServer/templates/NewNews"
+# Feeds are fetched concurrently on this long-lived pool.
+_executor = ThreadPoolExecutor(max_workers=len(FEEDS))
+
+# ETag / Last-Modified validators from the last successful fetch of each feed URL.
+_validators = {}
+_validators_lock = threading.Lock()
+
+def conditional_headers(url, page_title):
+    """
+    Returns If-None-Match / If-Modified-Since headers for a feed we have
+    already published, so an unchanged feed costs a 304.
+    """
+    if page_title not in store.get("news")["data"]:
+        return {}
+    with _validators_lock:
+        validators = _validators.get(url, {})
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def remember_validators(url, response):
+    with _validators_lock:
+        _validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
 
-def fetch_and_generate_html(feed_data):
+def counted(chunks, stats):
+    """Passes chunks through, adding their size to stats["bytes"]."""
+    for chunk in chunks:
+        stats["bytes"] += len(chunk)
+        yield chunk
+
+def fetch_and_publish_feed(feed_data):
     """
-    Fetches an RSS feed, parses it, and generates an HTML file
-    with the specified styling and structure.
+    Fetches an RSS feed, parses it, and publishes its articles to the
+    dashboard store, from which the web app renders the news pages.
+
+    By default the body is parsed as it streams in and the download stops
+    once the feed's item or age limit is reached, so large archive feeds
+    cost no more than the items displayed. Bodies over the byte limit are
+    abandoned.
+
+    If the server reports the feed unchanged (304), parsing and
+    publishing are skipped entirely.
     
     Args:
         feed_data (dict): A dictionary containing the RSS feed URL,
-                          output filename, and a descriptive title.
+                          page filename, and a descriptive title.
+
+    Returns:
+        dict: Fetch statistics with the feed title, HTTP status,
+              latency in seconds, bytes transferred, the number of
+              new or updated items and the error that stopped the
+              feed from updating, or None.
     """
     url = feed_data["url"]
-    filename = feed_data["filename"]
     page_title = feed_data["title"]
+    stats = {"title": page_title, "status": None, "latency": 0.0, "bytes": 0, "new_items": 0, "error": None}
 
     #print(f"Fetching feed from {url}...")
+    max_bytes = feed_data.get("max_bytes", MAX_FEED_BYTES)
     try:
-        # Use requests to get the feed content with a User-Agent and no SSL verification.
-        response = requests.get(url, timeout=10, headers=HEADERS, verify=False)
-        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-
-        # Parse the feed content using feedparser.
-        feed = feedparser.parse(response.text)
-
-        # Generate the HTML content for the news articles.
-        articles_html = ""
-        for entry in feed.entries:
-            # Safely get the publication date.
-            published_date = ""
-            if hasattr(entry, 'published_parsed'):
-                pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                published_date = pub_date.strftime("%B %d, %Y")
+        # Use the shared keep-alive client with a User-Agent and no SSL verification.
+        start = time.perf_counter()
+        headers = {**HEADERS, **conditional_headers(url, page_title)}
+        with client.get(url, timeout=10, headers=headers, verify=False, stream=True) as response:
+            stats["latency"] = time.perf_counter() - start
+            stats["status"] = response.status_code
+
+            if response.status_code == 304:
+                return stats
+            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+            if int(response.headers.get("Content-Length") or 0) > max_bytes:
+                raise FeedTooLarge(f"Feed body of {response.headers['Content-Length']} bytes exceeds {max_bytes}")
+
+            if feed_data.get("mode", "stream") == "full":
+                # Parse the whole feed content using feedparser.
+                stats["bytes"] = len(response.content)
+                entries = feedparser.parse(response.content).entries
             else:
-                published_date = datetime.now().strftime("%B %d, %Y")
-
-            # Create a clean summary or description.
-            summary = ""
-            if hasattr(entry, 'summary'):
-                summary = entry.summary
-            elif hasattr(entry, 'description'):
-                summary = entry.description
-
-            # Build the HTML for a single news card with the new styling.
-            articles_html += f"""
-            <div class="news-article">
-                <h2><a href="{entry.link}" target="_blank">{entry.title}</a></h2>
-                <p>{published_date}</p>
-                <p>{summary}</p>
-            </div>
-            """
-        
-        # Generate the full HTML page with the new styling and articles.
-        final_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{page_title} News Feed</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #202522;
-        }}
-        .container {{
-            max-width: 800px;
-            margin: auto;
-        }}
-        h1 {{
-            color: #cad4cb;
-            text-align: center;
-        }}
-        .news-article {{
-            background-color: #2f4132;
-            border: 1px solid #00bf1d;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 5px rgba(53, 53, 53, 0.5);
-        }}
-        .news-article h2 {{
-            margin-top: 0;
-            font-size: 1.4em;
-            color: #d0d8ce;
-        }}
-        .news-article h2 a {{
-            text-decoration: none;
-            color: inherit;
-        }}
-        .news-article h2 a:hover {{
-            text-decoration: underline;
-        }}
-        .news-article p {{
-            font-size: 1em;
-            color: #a2a2a2;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Latest News from {page_title}</h1>
-        <div id="news-container">
-            {articles_html}
-        </div>
-    </div>
-</body>
-</html>
-        """
-        
-        # Create the full path for the output file.
-        output_path = os.path.join(OUTPUT_DIRECTORY, filename)
-
-        # Write the final HTML to the output file.
-        with open(output_path, "w", encoding="utf-8") as file:
-            file.write(final_html)
-        
-        #print(f"Successfully generated {output_path}")
+                # Parse entries as the body arrives and stop at the item or age limit
+                entries = []
+                chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+                try:
+                    for entry in iter_feed_entries(counted(chunks, stats),
+                                                   max_items=feed_data.get("max_items", MAX_ITEMS),
+                                                   max_age_days=feed_data.get("max_age_days", MAX_AGE_DAYS),
+                                                   max_bytes=max_bytes):
+                        entries.append(entry)
+                except FeedTooLarge as e:
+                    # Entries read before the limit are complete and still published
+                    print(f"Stopped reading feed from {url}: {e}")
+
+        # Only new or revised entries are turned into items; unchanged ones are skipped.
+        changed = news_items.merge(page_title, entries)
+        stats["new_items"] = changed
+        if changed or page_title not in store.get("news")["data"]:
+            store.update("news", page_title,
+                         {"title": page_title, "url": url, "articles": news_items.items(page_title)})
+
+        # Only remember validators once the articles for this response are published.
+        remember_validators(url, response)
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching feed from {url}: {e}")
+        stats["error"] = f"Error fetching feed: {e}"
+    except FeedTooLarge as e:
+        print(f"Skipped feed from {url}: {e}")
+        stats["error"] = f"Skipped feed: {e}"
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+        stats["error"] = f"{type(e).__name__}: {e}"
 
-def main():
+    return stats
+
+def report_cycle(results):
+    """Prints per-feed latency and bytes transferred for one update cycle."""
+    for stats in results:
+        status = stats["status"] if stats["status"] is not None else "error"
+        print(f"  {stats['title']}: status {status}, {stats['latency'] * 1000:.0f} ms, {stats['bytes']} bytes, "
+              f"{stats['new_items']} new items")
+    print(f"  Total: {sum(stats['bytes'] for stats in results)} bytes")
+
+def update_feeds():
     """
-    Main function to orchestrate the HTML generation for all feeds in a continuous loop.
+    Runs one update cycle, fetching every feed concurrently over the shared HTTP client.
+
+    Raises:
+        RuntimeError: If any feed failed to update. The other feeds and the
+                      all-sources list are still published first.
     """
-    # Create the output directory if it doesn't exist.
-    if not os.path.exists(OUTPUT_DIRECTORY):
-        print(f"Creating directory: {OUTPUT_DIRECTORY}")
-        os.makedirs(OUTPUT_DIRECTORY)
+    #print("Starting a new update cycle...")
+    results = list(_executor.map(fetch_and_publish_feed, FEEDS))
 
+    # Published once every feed is merged; the store skips it if nothing changed
+    store.update("news", ALL_SOURCES["title"], {"title": ALL_SOURCES["title"], "url": None,
+                                                "show_sources": True,
+                                                "articles": news_items.merged(ALL_SOURCES_LIMIT)})
+    report_cycle(results)
+
+    failed = [stats for stats in results if stats["error"]]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} feeds failed: "
+                           + "; ".join(f"{stats['title']}: {stats['error']}" for stats in failed))
+
+def main():
+    """
+    Main function to publish all feeds in a continuous loop.
+    """
     while True:
-        #print("Starting a new update cycle...")
-        for feed in FEEDS:
-            fetch_and_generate_html(feed)
-        
+        try:
+            update_feeds()
+        except RuntimeError as e:
+            print(e)
+
         # Pause for 30 minutes before the next update.
         print("Update complete. Pausing for 30 minutes...")
         time.sleep(1800)
@@ -0,0 +1,152 @@
+import calendar
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+
+from markupsafe import Markup
+
+from artifact_writer import write_json
+
+# --- Configuration ---
+# Resolved from this file so the collectors and the web app share one copy
+NEWS_ITEMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "data", "news_items.json")
+MAX_ITEMS_PER_FEED = 50
+
+# Elements whose content is code, not text; striptags() alone would keep it
+NON_TEXT_ELEMENTS = re.compile(r"<(script|style)\b[^>]*>.*?(?:</\1\s*>|$)", re.IGNORECASE | re.DOTALL)
+
+
+def entry_key(entry):
+    """The stable identity of a feed entry: its GUID, else its link."""
+    return entry.get("id") or entry.get("link")
+
+
+def plain_text(html):
+    """
+    Reduces feed-supplied HTML to plain text: script and style elements
+    dropped with their content, other tags dropped, entities decoded and
+    whitespace collapsed.
+    """
+    return Markup(NON_TEXT_ELEMENTS.sub(" ", html)).striptags()
+
+
+def entry_version(entry):
+    """Changes whenever the publisher revises an entry."""
+    return entry.get("updated") or entry.get("published") or entry.get("title", "")
+
+
+class NewsItemStore:
+    """
+    Persistent news items per feed, keyed by entry GUID (or link).
+
+    merge() only builds items for entries that are new or whose version
+    changed since the last cycle, so the work per cycle scales with what
+    the publisher actually added. Each feed keeps its newest
+    MAX_ITEMS_PER_FEED items, sorted newest first. merged() interleaves
+    those sorted lists into one time-ordered "all sources" index, and the
+    result is cached until a feed changes.
+    """
+
+    def __init__(self, path=NEWS_ITEMS_PATH, max_items_per_feed=MAX_ITEMS_PER_FEED):
+        self.path = path
+        self.max_items_per_feed = max_items_per_feed
+        self._feeds = {}  # feed title -> {key: item}
+        self._sorted = {}  # feed title -> items, newest first
+        self._merged = None
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        for feed_title, items in saved.items():
+            self._feeds[feed_title] = {item["key"]: item for item in items}
+            self._sorted[feed_title] = items
+
+    def _build_item(self, feed_title, key, version, entry, existing):
+        published = entry.get("published_parsed")
+        if published:
+            published_ts = calendar.timegm(published)
+        elif existing is not None:
+            published_ts = existing["published_ts"]
+        else:
+            published_ts = time.time()  # undated entries count from when we first saw them
+
+        return {
+            "key": key,
+            "version": version,
+            "source": feed_title,
+            # Titles are already plain text and may name tags, e.g. "<iframe> abuse"
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": datetime.fromtimestamp(published_ts).strftime("%B %d, %Y"),
+            "published_ts": published_ts,
+            # Stored as text, so pages can escape it like any other value
+            "summary": plain_text(entry.get("summary") or entry.get("description") or ""),
+        }
+
+    def merge(self, feed_title, entries):
+        """
+        Records the new and revised entries of one feed and drops its oldest
+        items beyond the cap. Entries too old to make the cap are skipped
+        without being built, so an unchanged feed that lists more than
+        max_items_per_feed entries costs nothing.
+
+        Returns:
+            int: The number of items added or updated.
+        """
+        with self._lock:
+            items = self._feeds.setdefault(feed_title, {})
+            kept = self._sorted.get(feed_title, [])
+            # Once the feed is full, entries no newer than its oldest item would only be dropped again
+            floor = kept[-1]["published_ts"] if len(kept) >= self.max_items_per_feed else None
+            changed_keys = set()
+            for entry in entries:
+                key = entry_key(entry)
+                if not key:
+                    continue
+                existing = items.get(key)
+                published = entry.get("published_parsed")
+                if existing is None and floor is not None and published and calendar.timegm(published) <= floor:
+                    continue
+                version = entry_version(entry)
+                if existing is not None and existing["version"] == version:
+                    continue
+                items[key] = self._build_item(feed_title, key, version, entry, existing)
+                changed_keys.add(key)
+
+            if not changed_keys:
+                return 0
+            newest = sorted(items.values(), key=lambda item: item["published_ts"], reverse=True)
+            newest = newest[:self.max_items_per_feed]
+            self._feeds[feed_title] = {item["key"]: item for item in newest}
+            # Entries built but cut by the cap in the same pass were not added
+            changed = sum(1 for item in newest if item["key"] in changed_keys)
+            if changed:
+                self._sorted[feed_title] = newest
+                self._merged = None
+                write_json(self.path, self._sorted)
+            return changed
+
+    def items(self, feed_title):
+        """Returns the feed's items, newest first."""
+        with self._lock:
+            return list(self._sorted.get(feed_title, []))
+
+    def merged(self, limit=None):
+        """Returns the items of every feed in one list, newest first."""
+        with self._lock:
+            if self._merged is None:
+                self._merged = list(heapq.merge(*self._sorted.values(),
+                                                key=lambda item: item["published_ts"], reverse=True))
+            return list(islice(self._merged, limit))
+
+
+# Shared by the news collector and anything reading its items
+news_items = NewsItemStore()
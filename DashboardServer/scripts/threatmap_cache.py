@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import ijson  # pip install ijson
+import urllib3
+
+from artifact_writer import atomic_write, write_json
+from http_client import client
+
+# Disable SSL certificate warnings when using verify=False
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# --- Configuration ---
+THREATMAP_API = "https://fortiguard.fortinet.com/api/threatmap/live/outbreak"
+THREATMAP_SEGMENT_SEC = 300   # width of each segment in the 'ips' map
+THREATMAP_LAST_SEC = 3600     # how far back the payload reaches
+THREATMAP_LIMIT = 500         # maximum number of records
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_TTL = 60  # seconds; matches the Fortiscraper refresh interval
+CHUNK_SIZE = 64 * 1024
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "revalidated": 0}
+
+
+def threatmap_url(last_sec=THREATMAP_LAST_SEC, limit=THREATMAP_LIMIT, segment_sec=THREATMAP_SEGMENT_SEC):
+    """Builds the outbreak API URL for a window of last_sec seconds and up to limit records."""
+    return (f"{THREATMAP_API}?outbreak_id=0&segment_sec={segment_sec}"
+            f"&last_sec={last_sec}&replay=true&limit={limit}")
+
+
+THREATMAP_URL = threatmap_url()
+
+
+def cache_stats():
+    """Returns a snapshot of the hit/miss counters for this process."""
+    with _lock:
+        return dict(_stats)
+
+
+def _cache_paths(cache_dir, url):
+    """Returns the (body, metadata) cache file paths for url."""
+    name = "threatmap_" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, name + ".json"), os.path.join(cache_dir, name + ".meta.json")
+
+
+def _read_meta(body_path, meta_path, url):
+    if not os.path.exists(body_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("url") == url else None
+
+
+def fetch_threatmap_file(url=THREATMAP_URL, ttl=CACHE_TTL, cache_dir=CACHE_DIRECTORY, timeout=30):
+    """
+    Returns the path of a cached copy of the threat-map response body for
+    url, shared between collectors.
+
+    A copy younger than ttl seconds is returned without touching the
+    network. Older copies are revalidated with If-None-Match /
+    If-Modified-Since when the server supplied an ETag or Last-Modified, so
+    an unchanged payload costs a 304. A new body is streamed to disk in
+    chunks and never held in memory whole.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails.
+    """
+    body_path, meta_path = _cache_paths(cache_dir, url)
+
+    with _lock:
+        meta = _read_meta(body_path, meta_path, url)
+        if meta is not None and time.time() - meta["fetched_at"] < ttl:
+            _stats["hits"] += 1
+            return body_path
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with client.get(url, headers=headers, timeout=timeout, verify=False, stream=True) as response:
+            if response.status_code == 304 and meta is not None:
+                _stats["revalidated"] += 1
+                meta["fetched_at"] = time.time()
+                write_json(meta_path, meta)
+                return body_path
+
+            response.raise_for_status()
+            with atomic_write(body_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+        _stats["misses"] += 1
+        write_json(meta_path, {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        })
+        return body_path
+
+
+def iter_threat_items(path):
+    """
+    Yields each attack record from a threat-map body ({"ips": {segment: [record, ...]}})
+    one at a time, parsing the file incrementally so memory does not grow
+    with the number of records.
+
+    Raises:
+        ijson.JSONError: If the body is not valid JSON.
+    """
+    with open(path, "rb") as f:
+        builder = None
+        depth = 0
+        for prefix, event, value in ijson.parse(f):
+            if builder is None:
+                # Records sit at ips.<segment>.item
+                if event != "start_map" or not prefix.startswith("ips.") or not prefix.endswith(".item") \
+                        or prefix.count(".") != 2:
+                    continue
+                builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    yield builder.value
+                    builder = None
+
+
+def fetch_threat_items(url=THREATMAP_URL, ttl=CACHE_TTL, cache_dir=CACHE_DIRECTORY, timeout=30):
+    """
+    Fetches (or reuses) the cached threat-map body for url and yields its
+    attack records one at a time. See fetch_threatmap_file and
+    iter_threat_items.
+    """
+    return iter_threat_items(fetch_threatmap_file(url, ttl=ttl, cache_dir=cache_dir, timeout=timeout))
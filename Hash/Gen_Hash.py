@@ -1,53 +1,51 @@
-import hashlib
-import requests
+import os
 import sys
-import urllib3
 
-# Suppress the InsecureRequestWarning that is generated when using verify=False
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# The hashing code is shared with the dashboard's integrity checks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DashboardServer", "scripts"))
+from asset_hashes import MANIFEST_PATH, hash_assets, load_manifest, save_manifest
 
-# The URL of the file you want to hash
-url = "https://cdn.tailwindcss.com?version=3.4.3"
+# The URLs of the files you want to hash
+urls = ["https://cdn.tailwindcss.com?version=3.4.3"]
 
-def generate_and_save_hash(file_url, output_file):
+def generate_and_save_hash(file_urls, output_file=MANIFEST_PATH):
     """
-    Downloads a file from a given URL, computes its SHA-256 hash,
-    and saves the hash to a specified file.
-    
+    Downloads each file, computes its SHA-256 and SRI sha384 hashes while
+    it streams in, and records them in the asset manifest. The downloads
+    run in parallel; entries already in the manifest for other URLs are
+    kept.
+
     Args:
-        file_url (str): The URL of the file to download.
-        output_file (str): The path to the file where the hash will be saved.
+        file_urls (list): The URLs of the files to hash.
+        output_file (str): The path of the manifest to update.
     """
     try:
-        # Download the file content, bypassing SSL certificate verification
-        print(f"Downloading file from: {file_url}")
-        response = requests.get(file_url, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        # Get the content as bytes for hashing
-        file_content_bytes = response.content
-        
-        # Compute the SHA-256 hash
-        sha256_hash = hashlib.sha256(file_content_bytes).hexdigest()
-        
-        # Save the hash to the specified output file
-        with open(output_file, 'w') as f:
-            f.write(sha256_hash)
-            
-        print("\n" + "="*60)
-        print("          SHA-256 Hash Generated and Saved")
-        print("="*60)
-        print(f"URL: {file_url}")
-        print(f"SHA-256 Hash saved to: {output_file}")
-        print("-----------------------------------------------------")
-        
-    except requests.exceptions.RequestException as e:
-        print(f"\nError: An issue occurred while downloading the file: {e}", file=sys.stderr)
+        manifest = load_manifest(output_file)
+    except ValueError as e:
+        print(f"\nError: The existing manifest is not valid JSON: {e}", file=sys.stderr)
         sys.exit(1)
-    except Exception as e:
-        print(f"\nError: An unexpected error occurred: {e}", file=sys.stderr)
+
+    print(f"Downloading {len(file_urls)} file(s)...")
+    failed = False
+    for file_url, digests in hash_assets(file_urls).items():
+        if isinstance(digests, Exception):
+            print(f"\nError: An issue occurred while downloading {file_url}: {digests}", file=sys.stderr)
+            failed = True
+            continue
+        manifest[file_url] = {"sha256": digests["sha256"], "sha384": digests["sha384"]}
+        print(f"URL: {file_url}")
+        print(f"  SHA-256: {digests['sha256']}")
+        print(f"  SRI:     {digests['sha384']}")
+
+    save_manifest(manifest, output_file)
+    print("\n" + "="*60)
+    print("          Hashes Generated and Saved")
+    print("="*60)
+    print(f"Manifest saved to: {output_file}")
+    print("-----------------------------------------------------")
+    if failed:
         sys.exit(1)
 
 if __name__ == "__main__":
-    output_filename = "tailwind_hash.txt"
-    generate_and_save_hash(url, output_filename)
\ No newline at end of file
+    # Hash the URLs given on the command line, or the defaults above
+    generate_and_save_hash(sys.argv[1:] or urls)